@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import httpx
+
+from backend_test import HackathonAPITester
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / "frontend" / "backend"
+RESULTS_FILE = ROOT_DIR / "backend_benchmark_results.json"
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class EndpointStats:
+    """Latencies and status codes recorded for one endpoint in one phase"""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def record(self, seconds, status):
+        self.latencies.append(seconds)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "statuses": self.statuses,
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+            "mean_ms": _ms(sum(latencies) / len(latencies)) if latencies else None,
+            "p50_ms": _ms(percentile(latencies, 50)),
+            "p95_ms": _ms(percentile(latencies, 95)),
+            "p99_ms": _ms(percentile(latencies, 99)),
+            "max_ms": _ms(latencies[-1]) if latencies else None
+        }
+
+
+class HackathonLoadTester(HackathonAPITester):
+    """Seeds a hackathon and replays concurrent traffic against it.
+
+    Setup reuses the blocking admin helpers from HackathonAPITester; the load
+    phases run on httpx.AsyncClient so hundreds of simulated users share one
+    process. Every seeded name carries a per-run prefix, so repeated runs
+    against the same database do not collide.
+    """
+
+    def __init__(self, base_url="http://localhost:8000", teams=500, judges=60, criteria=5,
+                 duration=30.0, concurrency=200, poll_interval=2.0, think_time=1.0,
+                 team_password="bench-team-pass", seed=None):
+        super().__init__(base_url)
+        self.teams = teams
+        self.judges = judges
+        self.criteria = criteria
+        self.duration = duration
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.think_time = think_time
+        self.team_password = team_password
+        self.seed = seed if seed is not None else int(time.time())
+
+        self.run_id = f"bench{self.seed}"
+        self.team_names = [f"{self.run_id}-team-{i:04d}" for i in range(teams)]
+        self.judge_ids = [f"{self.run_id}-judge-{i:03d}" for i in range(judges)]
+        self.judge_password = "bench-judge-pass"
+        self.criteria_names = []
+        self.judge_tokens = {}
+        self.team_tokens = {}
+        self.phases = {}
+
+    def seed_data(self):
+        """Create judges, teams, criteria, the team password and a running timer"""
+        print(f"\n🌱 Seeding {self.judges} judges, {self.teams} teams, {self.criteria} criteria...")
+
+        started = time.perf_counter()
+        success, response, status_code = self.make_request(
+            'POST', 'admin/judges/import',
+            data=[{"judge_id": judge_id, "name": judge_id, "password": self.judge_password}
+                  for judge_id in self.judge_ids],
+            token=self.admin_token
+        )
+        self.log_test("Seed Judges", success,
+                      f"Inserted {response.get('inserted')} in {time.perf_counter() - started:.2f}s"
+                      if success else f"Status: {status_code}")
+
+        started = time.perf_counter()
+        success, response, status_code = self.make_request(
+            'POST', 'admin/teams/import',
+            data=[{"team_name": team_name, "project_name": f"Project {team_name}"}
+                  for team_name in self.team_names],
+            token=self.admin_token
+        )
+        self.log_test("Seed Teams", success,
+                      f"Inserted {response.get('inserted')} in {time.perf_counter() - started:.2f}s"
+                      if success else f"Status: {status_code}")
+
+        for i in range(self.criteria):
+            name = f"{self.run_id}-criterion-{i}"
+            success, _, status_code = self.make_request(
+                'POST', 'admin/criteria',
+                data={"name": name, "max_score": 10},
+                token=self.admin_token
+            )
+            if success:
+                self.criteria_names.append(name)
+        self.log_test("Seed Criteria", len(self.criteria_names) == self.criteria,
+                      f"Created {len(self.criteria_names)} criteria")
+
+        success, _, status_code = self.make_request(
+            'POST', 'admin/set-team-password',
+            data={"password": self.team_password},
+            token=self.admin_token
+        )
+        self.log_test("Seed Team Password", success, f"Status: {status_code}")
+
+        success, _, status_code = self.make_request(
+            'POST', 'admin/timer',
+            data={"end_time": (datetime.now(timezone.utc) + timedelta(hours=2)).isoformat(), "is_active": True},
+            token=self.admin_token
+        )
+        self.log_test("Seed Timer", success, f"Status: {status_code}")
+
+    async def timed(self, client, stats, label, method, endpoint, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, f"/api/{endpoint}", **kwargs)
+        except httpx.HTTPError:
+            stats.setdefault(label, EndpointStats()).errors += 1
+            return None
+        stats.setdefault(label, EndpointStats()).record(time.perf_counter() - started, response.status_code)
+        return response
+
+    async def login_storm(self, client):
+        """Every judge and team logs in at once, as at the opening ceremony"""
+        stats = {}
+
+        async def login(role, identifier, password, tokens):
+            response = await self.timed(client, stats, "POST /auth/login", "POST", "auth/login",
+                                        json={"role": role, "identifier": identifier, "password": password})
+            if response is not None and response.status_code == 200:
+                tokens[identifier] = response.json()["token"]
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(login("judge", judge_id, self.judge_password, self.judge_tokens) for judge_id in self.judge_ids),
+            *(login("team", team_name, self.team_password, self.team_tokens) for team_name in self.team_names)
+        )
+        elapsed = time.perf_counter() - started
+        self.phases["login_storm"] = {
+            "elapsed_s": round(elapsed, 3),
+            "endpoints": {label: s.summary(elapsed) for label, s in stats.items()}
+        }
+        self.log_test("Login Storm", len(self.judge_tokens) + len(self.team_tokens) == self.judges + self.teams,
+                      f"{len(self.judge_tokens)} judges, {len(self.team_tokens)} teams in {elapsed:.2f}s")
+
+    async def judge_user(self, client, stats, judge_id, deadline):
+        headers = {"Authorization": f"Bearer {self.judge_tokens[judge_id]}"}
+        rng = random.Random(f"{self.seed}-{judge_id}")
+        leaderboard_etag = None
+        while time.perf_counter() < deadline:
+            team_name = rng.choice(self.team_names)
+            await self.timed(client, stats, "POST /judge/score", "POST", "judge/score", headers=headers, json={
+                "team_name": team_name,
+                "scores": {name: rng.randint(0, 10) for name in self.criteria_names},
+                "idempotency_key": f"{judge_id}-{team_name}-{rng.random()}"
+            })
+            poll_headers = dict(headers, **({"If-None-Match": leaderboard_etag} if leaderboard_etag else {}))
+            response = await self.timed(client, stats, "GET /judge/leaderboard", "GET", "judge/leaderboard",
+                                        headers=poll_headers)
+            if response is not None:
+                leaderboard_etag = response.headers.get("etag", leaderboard_etag)
+            await asyncio.sleep(rng.expovariate(1 / self.think_time))
+
+    async def team_user(self, client, stats, team_name, deadline):
+        headers = {"Authorization": f"Bearer {self.team_tokens[team_name]}"}
+        rng = random.Random(f"{self.seed}-{team_name}")
+        # Spread pollers out instead of firing in lockstep
+        await asyncio.sleep(rng.uniform(0, self.poll_interval))
+        while time.perf_counter() < deadline:
+            await self.timed(client, stats, "GET /team/timer", "GET", "team/timer", headers=headers)
+            await self.timed(client, stats, "GET /team/score", "GET", "team/score", headers=headers)
+            await asyncio.sleep(self.poll_interval)
+
+    async def public_viewer(self, client, stats, viewer, deadline):
+        rng = random.Random(f"{self.seed}-viewer-{viewer}")
+        await asyncio.sleep(rng.uniform(0, self.poll_interval))
+        etag = None
+        while time.perf_counter() < deadline:
+            response = await self.timed(client, stats, "GET /public/leaderboard", "GET", "public/leaderboard",
+                                        headers={"If-None-Match": etag} if etag else {})
+            if response is not None:
+                etag = response.headers.get("etag", etag)
+            await asyncio.sleep(self.poll_interval)
+
+    async def mixed_load(self, client, viewers):
+        """Judges score and watch the leaderboard while teams and the public poll"""
+        stats = {}
+        started = time.perf_counter()
+        deadline = started + self.duration
+        await asyncio.gather(
+            *(self.judge_user(client, stats, judge_id, deadline) for judge_id in self.judge_tokens),
+            *(self.team_user(client, stats, team_name, deadline) for team_name in self.team_tokens),
+            *(self.public_viewer(client, stats, viewer, deadline) for viewer in range(viewers))
+        )
+        elapsed = time.perf_counter() - started
+        self.phases["mixed_load"] = {
+            "elapsed_s": round(elapsed, 3),
+            "endpoints": {label: s.summary(elapsed) for label, s in sorted(stats.items())}
+        }
+        total = sum(len(s.latencies) for s in stats.values())
+        errors = sum(s.errors for s in stats.values())
+        self.log_test("Mixed Load", errors == 0, f"{total} requests, {errors} errors in {elapsed:.2f}s")
+
+    async def run_load(self, viewers):
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=30) as client:
+            await self.login_storm(client)
+            await self.mixed_load(client, viewers)
+
+    def run_benchmark(self, viewers=100):
+        print("🚀 Starting Hackathon API Benchmark...")
+        print(f"🌐 Benchmarking: {self.base_url}")
+
+        if not self.test_admin_login():
+            return False
+        self.seed_data()
+        asyncio.run(self.run_load(viewers))
+
+        for phase, result in self.phases.items():
+            print(f"\n📊 {phase} ({result['elapsed_s']}s)")
+            for label, summary in result["endpoints"].items():
+                print(f"   {label:<28} {summary['requests']:>7} req  {summary['throughput_rps']:>8} rps  "
+                      f"p50 {summary['p50_ms']}ms  p95 {summary['p95_ms']}ms  p99 {summary['p99_ms']}ms")
+
+        return self.tests_passed == self.tests_run
+
+
+def start_server(port, db_name):
+    """Start uvicorn on the backend against a throwaway database"""
+    env = dict(os.environ, DB_NAME=db_name)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        try:
+            if httpx.get(f"http://localhost:{port}/api/ready", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Server did not start within 30s")
+
+
+def compare(previous_path, phases):
+    """Print p95 changes against an earlier results file"""
+    previous = json.loads(Path(previous_path).read_text())["phases"]
+    print(f"\n🔁 p95 compared with {previous_path}")
+    for phase, result in phases.items():
+        for label, summary in result["endpoints"].items():
+            before = previous.get(phase, {}).get("endpoints", {}).get(label, {}).get("p95_ms")
+            if before and summary["p95_ms"] is not None:
+                change = (summary["p95_ms"] - before) / before * 100
+                print(f"   {phase} {label:<28} {before}ms -> {summary['p95_ms']}ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark for the hackathon API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--start-server", action="store_true",
+                        help="start uvicorn on --port against a fresh database (uses MONGO_URL)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--judges", type=int, default=60)
+    parser.add_argument("--criteria", type=int, default=5)
+    parser.add_argument("--viewers", type=int, default=100, help="public leaderboard pollers")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of mixed load")
+    parser.add_argument("--concurrency", type=int, default=200, help="max open connections")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean seconds between judge actions")
+    parser.add_argument("--seed", type=int, default=None, help="makes names and traffic reproducible")
+    parser.add_argument("--output", default=str(RESULTS_FILE))
+    parser.add_argument("--compare", help="earlier results file to compare p95 against")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if args.start_server:
+        db_name = f"hackathon_bench_{int(time.time())}"
+        server = start_server(args.port, db_name)
+        base_url = f"http://localhost:{args.port}"
+        print(f"🗄️  Started server on {base_url} with database {db_name}")
+
+    tester = HackathonLoadTester(
+        base_url=base_url, teams=args.teams, judges=args.judges, criteria=args.criteria,
+        duration=args.duration, concurrency=args.concurrency, poll_interval=args.poll_interval,
+        think_time=args.think_time, seed=args.seed
+    )
+    try:
+        success = tester.run_benchmark(viewers=args.viewers)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "config": {
+                "base_url": base_url,
+                "teams": args.teams,
+                "judges": args.judges,
+                "criteria": args.criteria,
+                "viewers": args.viewers,
+                "duration_s": args.duration,
+                "concurrency": args.concurrency,
+                "poll_interval_s": args.poll_interval,
+                "think_time_s": args.think_time,
+                "seed": tester.seed
+            },
+            "phases": tester.phases,
+            "results": tester.test_results
+        }, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        compare(args.compare, tester.phases)
+
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -405,11 +405,127 @@ class HackathonAPITester:
             self.log_test("Admin Leaderboard", False, f"Status: {status_code}")
             return False
 
+    def test_readiness(self):
+        """Test liveness and readiness probes"""
+        print("\n🩺 Testing Health & Readiness...")
+        
+        success, response, status_code = self.make_request('GET', 'health')
+        self.log_test("Health Check", success, f"Status: {status_code}")
+
+        success, response, status_code = self.make_request('GET', 'ready')
+        if success and response.get('ready'):
+            self.log_test("Readiness Check", True, f"Warm-up: {response.get('warmup_ms')}ms")
+            return True
+        else:
+            self.log_test("Readiness Check", False, f"Status: {status_code}")
+            return False
+
+    def test_admin_bulk_import(self):
+        """Test bulk import of judges and teams"""
+        print("\n📥 Testing Bulk Import...")
+        
+        if not self.admin_token:
+            self.log_test("Bulk Import", False, "No admin token available")
+            return False
+
+        # Re-running against the same database reports the rows as conflicts
+        judges = [
+            {"judge_id": "import_judge001", "name": "Imported Judge 1", "password": "judge123"},
+            {"judge_id": "import_judge002", "name": "Imported Judge 2", "password": "judge123"}
+        ]
+        success, response, status_code = self.make_request(
+            'POST', 'admin/judges/import',
+            data=judges,
+            token=self.admin_token
+        )
+        
+        if success and response.get('inserted', 0) + len(response.get('conflicts', [])) == len(judges):
+            self.log_test("Import Judges", True,
+                          f"Inserted {response['inserted']}, conflicts {len(response['conflicts'])}")
+        else:
+            self.log_test("Import Judges", False, f"Status: {status_code}, Response: {response}")
+
+        # Teams as CSV, with members separated by ';'
+        csv_body = "team_name,project_name,members\nImportTeam1,Project One,Ana;Ben\nImportTeam2,Project Two,Chloe\n"
+        try:
+            response = requests.post(
+                f"{self.base_url}/api/admin/teams/import",
+                data=csv_body.encode(),
+                headers={'Content-Type': 'text/csv', 'Authorization': f'Bearer {self.admin_token}'},
+                timeout=10
+            )
+            result = response.json()
+            success = response.status_code == 200 and result.get('inserted', 0) + len(result.get('conflicts', [])) == 2
+            self.log_test("Import Teams CSV", success, f"Status: {response.status_code}, Response: {result}")
+        except requests.exceptions.RequestException as e:
+            self.log_test("Import Teams CSV", False, str(e))
+
+        # One invalid row rejects the whole batch
+        success, response, status_code = self.make_request(
+            'POST', 'admin/judges/import',
+            data=[{"judge_id": "import_judge003", "name": "Valid", "password": "judge123"}, {"judge_id": "x"}],
+            token=self.admin_token,
+            expected_status=400
+        )
+        self.log_test("Reject Invalid Import", success, f"Status: {status_code}")
+        return success
+
+    def test_admin_score_export(self):
+        """Test streaming score export in both formats"""
+        print("\n📤 Testing Score Export...")
+        
+        if not self.admin_token:
+            self.log_test("Score Export", False, "No admin token available")
+            return False
+
+        headers = {'Authorization': f'Bearer {self.admin_token}'}
+        all_passed = True
+        try:
+            response = requests.get(f"{self.base_url}/api/admin/export/scores",
+                                    params={"format": "ndjson"}, headers=headers, timeout=10)
+            rows = [json.loads(line) for line in response.text.splitlines() if line]
+            success = response.status_code == 200 and all('team_name' in row for row in rows)
+            self.log_test("Export Scores NDJSON", success, f"Status: {response.status_code}, {len(rows)} rows")
+            all_passed = all_passed and success
+
+            response = requests.get(f"{self.base_url}/api/admin/export/scores",
+                                    params={"format": "csv"}, headers=headers, timeout=10)
+            header = response.text.splitlines()[0] if response.text else ""
+            success = response.status_code == 200 and header.startswith("judge_id,team_name,criterion")
+            self.log_test("Export Scores CSV", success, f"Status: {response.status_code}, Header: {header}")
+            all_passed = all_passed and success
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.log_test("Score Export", False, str(e))
+            return False
+        return all_passed
+
+    def test_admin_query_diagnostics(self):
+        """Test per-route Mongo query diagnostics"""
+        print("\n🔎 Testing Query Diagnostics...")
+        
+        if not self.admin_token:
+            self.log_test("Query Diagnostics", False, "No admin token available")
+            return False
+
+        success, response, status_code = self.make_request(
+            'GET', 'admin/diagnostics/queries',
+            token=self.admin_token
+        )
+        
+        if success and isinstance(response.get('routes'), dict):
+            self.log_test("Query Diagnostics", True, f"{len(response['routes'])} routes profiled")
+            return True
+        else:
+            self.log_test("Query Diagnostics", False, f"Status: {status_code}")
+            return False
+
     def run_all_tests(self):
         """Run comprehensive API tests"""
         print("🚀 Starting Hackathon API Tests...")
         print(f"🌐 Testing against: {self.base_url}")
         
+        self.test_readiness()
+
         # Test admin functionality
         if self.test_admin_login():
             self.test_admin_judge_management()
@@ -417,6 +533,7 @@ class HackathonAPITester:
             self.test_admin_team_password()
             self.test_admin_timer_management()
             self.test_admin_leaderboard()
+            self.test_admin_bulk_import()
 
         # Test judge functionality
         if self.test_judge_login():
@@ -430,6 +547,11 @@ class HackathonAPITester:
         # Test public endpoints
         self.test_public_leaderboard()
 
+        # Admin views over the data created above
+        if self.admin_token:
+            self.test_admin_score_export()
+            self.test_admin_query_diagnostics()
+
         # Print summary
         print(f"\n📊 Test Summary:")
         print(f"   Tests Run: {self.tests_run}")
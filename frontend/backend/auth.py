@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from worker_pool import LazyPool
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification in a bounded worker pool.
+
+    bcrypt is CPU-bound (~250 ms per call), so it is kept off the event loop.
+    At most ``max_concurrency`` calls are handed to the pool at once; the
+    rest wait on a semaphore, which is what ``queued`` reports.
+    """
+
+    def __init__(self, kind: str = "thread", workers: Optional[int] = None,
+                 max_concurrency: Optional[int] = None):
+        self.kind = kind
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_concurrency = max_concurrency or self.workers * 2
+        self._pool = LazyPool(kind, self.workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        self.queued = 0
+        self.peak_queued = 0
+        self.running = 0
+        self.completed = 0
+        self.busy_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "running": self.running,
+            "completed": self.completed,
+            "avg_ms": round(self.busy_seconds / self.completed * 1000, 2) if self.completed else None
+        }
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+    async def _run(self, fn, *args):
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        started = time.perf_counter()
+        try:
+            return await self._pool.run(fn, *args)
+        finally:
+            self._slots.release()
+            self.running -= 1
+            self.completed += 1
+            self.busy_seconds += time.perf_counter() - started
+
+
+
+class TokenCache:
+    """Bounded LRU cache of verified JWT payloads.
+
+    Entries are keyed by a SHA-256 digest of the raw token, so tokens are not
+    kept in memory, and expire after ``ttl`` seconds or at the token's own
+    ``exp``, whichever comes first.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        key = hashlib.sha256(token.encode()).hexdigest()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, payload: dict):
+        expires_at = time.time() + self.ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+
+        key = hashlib.sha256(token.encode()).hexdigest()
+        self._entries[key] = (expires_at, dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+        }
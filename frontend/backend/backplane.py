@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from pymongo import CursorType, ReturnDocument
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Server error code when a capped collection overwrote a tailable cursor's position
+CAPPED_POSITION_LOST = 136
+
+Deliver = Callable[[dict], Awaitable[None]]
+
+
+class Backplane:
+    """Carries state-change events to every worker process.
+
+    Each published event is stamped with a global sequence number and handed
+    to ``deliver`` exactly once per worker, in sequence order, including on
+    the worker that published it.
+    """
+
+    async def start(self, deliver: Deliver):
+        raise NotImplementedError
+
+    async def publish(self, event: dict):
+        raise NotImplementedError
+
+    async def stop(self):
+        pass
+
+
+class InProcessBackplane(Backplane):
+    """Single-process backplane: events are delivered before publish returns"""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+        self._lock = asyncio.Lock()
+        self.seq = 0
+        # Events never go missing in process; kept for the metrics
+        self.gaps_skipped = 0
+        self.resyncs = 0
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def publish(self, event: dict):
+        # The lock keeps deliveries from interleaving across awaits
+        async with self._lock:
+            self.seq += 1
+            await self._deliver({**event, "seq": self.seq})
+
+
+class MongoBackplane(Backplane):
+    """Multi-worker backplane over a capped collection, no broker required.
+
+    Publishers take a sequence number from a counter document and insert the
+    event; every worker tails the capped collection with a tailable-await
+    cursor. Two publishers can insert out of sequence order, so events are
+    held in a reorder buffer until their predecessors arrive. A sequence
+    number that never shows up (its publisher died, or stalled between the
+    two writes) is skipped after ``gap_timeout`` seconds.
+
+    Whenever this worker may have missed an event (a skipped gap, a late
+    event arriving after its gap was skipped, or the capped collection
+    overwriting the cursor's position) it publishes a ``resync`` event, on
+    which every worker reloads its state from Mongo. It is published rather
+    than handled locally so that it carries a global sequence number like any
+    other change.
+    """
+
+    def __init__(self, db, collection: str = "broadcast_events", capped_bytes: int = 8 * 1024 * 1024,
+                 gap_timeout: float = 1.0):
+        self._db = db
+        self._name = collection
+        self._events = db[collection]
+        self.capped_bytes = capped_bytes
+        self.gap_timeout = gap_timeout
+        self._deliver: Optional[Deliver] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, dict] = {}
+        self._gap_since: Optional[float] = None
+        self._needs_resync = False
+        self.seq = 0
+        self.gaps_skipped = 0
+        self.resyncs = 0
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+        try:
+            await self._db.create_collection(self._name, capped=True, size=self.capped_bytes)
+        except CollectionInvalid:
+            pass
+
+        # Only events published after this worker started are delivered
+        last = await self._events.find_one({}, sort=[("$natural", -1)])
+        counter = await self._db.counters.find_one({"_id": self._name})
+        self.seq = max(last["seq"] if last else 0, counter["seq"] if counter else 0)
+        self._task = asyncio.create_task(self._tail())
+
+    async def publish(self, event: dict):
+        counter = await self._db.counters.find_one_and_update(
+            {"_id": self._name},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        await self._events.insert_one({"seq": counter["seq"], "event": event})
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _tail(self):
+        while True:
+            cursor = self._events.find(
+                {"seq": {"$gt": self.seq}},
+                cursor_type=CursorType.TAILABLE_AWAIT,
+                max_await_time_ms=int(self.gap_timeout * 1000)
+            )
+            try:
+                while cursor.alive:
+                    async for doc in cursor:
+                        await self._receive(doc)
+                    await self._flush()
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                if getattr(e, "code", None) == CAPPED_POSITION_LOST:
+                    # Events this worker had not read yet were overwritten
+                    logger.warning("Backplane fell behind the capped collection: %s", e)
+                    self._needs_resync = True
+                else:
+                    logger.warning("Backplane cursor failed, retrying: %s", e)
+                await self._publish_resync()
+            await asyncio.sleep(0.5)
+
+    async def _receive(self, doc: dict):
+        # A publisher that stalled past gap_timeout can insert an event this
+        # worker already skipped; delivering it now would be out of order
+        if doc["seq"] <= self.seq:
+            logger.warning("Backplane dropped late event %d", doc["seq"])
+            self._needs_resync = True
+            await self._publish_resync()
+            return
+        self._pending[doc["seq"]] = doc["event"]
+        await self._flush()
+
+    async def _flush(self):
+        if self._pending and self.seq + 1 not in self._pending:
+            if self._gap_since is None:
+                self._gap_since = time.monotonic()
+            elif time.monotonic() - self._gap_since >= self.gap_timeout:
+                skipped_to = min(self._pending) - 1
+                logger.warning("Backplane skipped missing events %d-%d", self.seq + 1, skipped_to)
+                self.gaps_skipped += skipped_to - self.seq
+                self.seq = skipped_to
+                self._needs_resync = True
+
+        while self.seq + 1 in self._pending:
+            self.seq += 1
+            self._gap_since = None
+            event = self._pending.pop(self.seq)
+            try:
+                await self._deliver({**event, "seq": self.seq})
+            except Exception:
+                logger.exception("Backplane event %d failed", self.seq)
+        await self._publish_resync()
+
+    async def _publish_resync(self):
+        # Kept pending until the publish succeeds
+        if not self._needs_resync:
+            return
+        try:
+            await self.publish({"type": "resync"})
+        except PyMongoError as e:
+            logger.warning("Backplane resync failed, retrying: %s", e)
+            return
+        self._needs_resync = False
+        self.resyncs += 1
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from typing import List, Optional, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+
+MAX_IMPORT_ROWS = 5000
+
+# CSV cells holding lists use this separator, e.g. "Ana;Ben;Chloe"
+LIST_SEPARATOR = ";"
+
+
+def parse_rows(body: bytes, content_type: Optional[str], list_fields: Tuple[str, ...] = ()) -> List[dict]:
+    """Read a JSON array of objects, or CSV with a header row"""
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import must be UTF-8")
+
+    if content_type and content_type.split(";")[0].strip() == "text/csv":
+        rows = []
+        for row in csv.DictReader(io.StringIO(text)):
+            # Empty cells are treated as missing
+            row = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            for field in list_fields:
+                if field in row:
+                    row[field] = [item.strip() for item in row[field].split(LIST_SEPARATOR) if item.strip()]
+            rows.append(row)
+    else:
+        try:
+            rows = json.loads(text)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of rows")
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="No rows to import")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=400, detail=f"Too many rows. Max: {MAX_IMPORT_ROWS}")
+    return rows
+
+
+def validate_rows(rows: List[dict], model: Type[BaseModel], key: str) -> List[BaseModel]:
+    """Validate every row, rejecting the whole batch if any row is invalid.
+
+    Rows are numbered from 1 in the order given; duplicate keys within the
+    batch count as invalid.
+    """
+    valid, errors, seen = [], [], {}
+    for number, row in enumerate(rows, start=1):
+        try:
+            item = model.model_validate(row)
+        except ValidationError as e:
+            errors.append({"row": number, "errors": [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ]})
+            continue
+        value = getattr(item, key)
+        if value in seen:
+            errors.append({"row": number, "errors": [f"{key}: duplicate of row {seen[value]}"]})
+            continue
+        seen[value] = number
+        valid.append(item)
+
+    if errors:
+        raise HTTPException(status_code=400, detail={"message": "Import rejected", "rows": errors})
+    return valid
+
+
+async def insert_rows(collection, docs: List[dict], key: str) -> dict:
+    """Insert in one unordered batch; rows that hit a unique index are reported
+    as conflicts, the rest are written"""
+    conflicts, failed = [], []
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        inserted = len(result.inserted_ids)
+    except BulkWriteError as e:
+        inserted = e.details.get("nInserted", 0)
+        for error in e.details.get("writeErrors", []):
+            entry = {"row": error["index"] + 1, key: docs[error["index"]][key]}
+            if error.get("code") == 11000:
+                conflicts.append(entry)
+            else:
+                failed.append({**entry, "error": error.get("errmsg")})
+
+    return {
+        "inserted": inserted,
+        "conflicts": conflicts,
+        "failed": failed
+    }
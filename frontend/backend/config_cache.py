@@ -0,0 +1,63 @@
+import time
+from typing import Optional
+from pymongo import ReturnDocument
+
+
+def _stamp(doc: Optional[dict]):
+    return (doc["_id"], doc.get("version")) if doc else None
+
+
+class SingletonConfigCache:
+    """In-process copy of a single-document config collection.
+
+    Writes made through ``set`` bump a ``version`` stamp on the document and
+    refresh the cache immediately. Changes made elsewhere (another worker, or
+    a manual edit that replaces the document or bumps ``version``) are picked
+    up by fetching only the stamp, at most once every ``revalidate_seconds``.
+    """
+
+    def __init__(self, collection, revalidate_seconds: float = 5.0):
+        self._collection = collection
+        self.revalidate_seconds = revalidate_seconds
+        self._doc: Optional[dict] = None
+        self._stamp = None
+        self._loaded = False
+        self._checked_at = 0.0
+
+    async def load(self):
+        """Read the document from Mongo, replacing the cached copy"""
+        self._store(await self._collection.find_one({}))
+
+    async def get(self) -> Optional[dict]:
+        """Cached document without ``_id``/``version``, or None if unset"""
+        if not self._loaded:
+            await self.load()
+        elif time.monotonic() - self._checked_at >= self.revalidate_seconds:
+            # Mark as checked first so concurrent readers don't all revalidate
+            self._checked_at = time.monotonic()
+            current = await self._collection.find_one({}, {"version": 1})
+            if _stamp(current) != self._stamp:
+                await self.load()
+        return self._doc
+
+    async def set(self, fields: dict) -> dict:
+        """Replace the config fields and bump the version stamp"""
+        doc = await self._collection.find_one_and_update(
+            {},
+            {"$set": fields, "$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        await self._collection.delete_many({"_id": {"$ne": doc["_id"]}})
+        self._store(doc)
+        return self._doc
+
+    def invalidate(self):
+        """Force the next read to go to Mongo"""
+        self._loaded = False
+
+    def _store(self, doc: Optional[dict]):
+        self._stamp = _stamp(doc)
+        self._doc = {k: v for k, v in doc.items() if k not in ("_id", "version")} if doc else None
+        self._loaded = True
+        self._checked_at = time.monotonic()
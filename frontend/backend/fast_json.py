@@ -0,0 +1,121 @@
+import gzip
+import json
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; the saving is not worth it
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q-values"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidates = [(weights.get(c, weights.get("*", 0.0)), -i, c) for i, c in enumerate(supported)]
+    q, _, coding = max(candidates)
+    return coding if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _json_response(body: bytes, headers: Dict[str, str], encoding: Optional[str]) -> Response:
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# body, headers, {encoding: compressed body}
+CachedBody = Tuple[bytes, Dict[str, str], Dict[str, bytes]]
+
+
+class ResponseCache:
+    """Encoded list responses, valid until the collection they read changes.
+
+    Entries are keyed by path and query string and hold the JSON body, the
+    headers the loader set (e.g. ``X-Next-Cursor``) and compressed variants,
+    built on first request for each encoding, so a hot list is encoded and
+    compressed once per change rather than per request. ``invalidate`` is
+    called when the collection changes; a load that overlaps an invalidation
+    is served but not stored, so a stale body is never cached.
+
+    Loaded data skips ``response_model`` validation: the route keeps its
+    ``response_model`` so the OpenAPI schema is unchanged, and callers must
+    only return data that already matches it.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self.version += 1
+        self._entries.clear()
+
+    async def respond(self, request: Request, load: Callable[[Response], Awaitable]) -> Response:
+        """Serve ``request`` from the cache, calling ``load(response)`` on a miss"""
+        key = f"{request.url.path}?{request.url.query}"
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            version = self.version
+            response = Response()
+            data = await load(response)
+            headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+            entry = (dumps(data), headers, {})
+            if version == self.version:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        body, headers, variants = entry
+        encoding = None
+        if len(body) >= MIN_COMPRESS_SIZE:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        if encoding is not None:
+            if encoding not in variants:
+                variants[encoding] = compress(body, encoding)
+            body = variants[encoding]
+        return _json_response(body, headers, encoding)
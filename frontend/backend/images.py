@@ -0,0 +1,111 @@
+import asyncio
+import importlib.util
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Set
+from worker_pool import LazyPool
+
+# Pillow is optional (uploads are then served as-is) and only imported by
+# the worker processes, which keeps it out of server start-up
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each derivative
+DERIVATIVES = {
+    "thumb": 320,
+    "medium": 1024,
+}
+WEBP_QUALITY = 80
+
+
+def _write_webp(image, path: Path):
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    image.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+    os.replace(tmp_path, path)
+
+
+def render_derivatives(source: str, stem: str) -> Dict[str, str]:
+    """Decode ``source`` once and write ``<stem>.<name>.webp`` next to it for
+    each derivative, largest first; returns {name: filename}"""
+    from PIL import Image, ImageOps
+
+    source_path = Path(source)
+    written = {name: f"{stem}.{name}.webp" for name in DERIVATIVES}
+    if all(source_path.with_name(filename).exists() for filename in written.values()):
+        # Stems are content hashes, so existing derivatives are already right
+        return written
+
+    with Image.open(source_path) as image:
+        # JPEG can decode straight at a reduced scale, which is much cheaper
+        image.draft("RGB", (max(DERIVATIVES.values()),) * 2)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    for name, edge in sorted(DERIVATIVES.items(), key=lambda item: -item[1]):
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        _write_webp(image, source_path.with_name(written[name]))
+    return written
+
+
+OnRendered = Callable[[Dict[str, str]], Awaitable[None]]
+
+
+class ImagePipeline:
+    """Renders upload derivatives in a process pool, in the background.
+
+    ``schedule`` returns immediately; when rendering finishes ``on_rendered``
+    is awaited on the event loop with the derivative filenames. Failures are
+    logged and leave the original upload in place. Without Pillow installed
+    the pipeline is disabled and ``schedule`` does nothing.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or min(2, os.cpu_count() or 1)
+        self.enabled = HAS_PILLOW
+        self._pool = LazyPool("process", self.workers)
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.rendered = 0
+        self.failed = 0
+
+        if not self.enabled:
+            logger.warning("Pillow is not installed; image derivatives are disabled")
+
+    def schedule(self, source: Path, stem: str, on_rendered: OnRendered):
+        if not self.enabled:
+            return
+        task = asyncio.create_task(self._render(source, stem, on_rendered))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "pending": self.pending,
+            "rendered": self.rendered,
+            "failed": self.failed
+        }
+
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        self._pool.shutdown()
+
+    async def _render(self, source: Path, stem: str, on_rendered: OnRendered):
+        try:
+            filenames = await self._pool.run(render_derivatives, str(source), stem)
+            await on_rendered(filenames)
+            self.rendered += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.failed += 1
+            logger.exception("Failed to render derivatives for %s", source.name)
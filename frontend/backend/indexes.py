@@ -0,0 +1,133 @@
+import logging
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+# Indexes the API relies on, per collection. Names are fixed so startup can
+# tell which ones already exist without comparing key specs.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "scores": [
+        IndexModel([("judge_id", ASCENDING), ("team_name", ASCENDING)],
+                   name="judge_id_team_name_unique", unique=True),
+        # Serves the leaderboard $lookup and per-team score reads
+        IndexModel([("team_name", ASCENDING), ("judge_id", ASCENDING)],
+                   name="team_name_judge_id"),
+    ],
+    # team_name_unique also covers the leaderboard's {team_name} projection
+    "teams": [
+        IndexModel([("team_name", ASCENDING)], name="team_name_unique", unique=True),
+    ],
+    "judges": [
+        IndexModel([("judge_id", ASCENDING)], name="judge_id_unique", unique=True),
+    ],
+    "criteria": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "admins": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+}
+
+# Collections whose duplicates are removed automatically when a unique index
+# is first introduced, and which one to keep: the latest score submission.
+# Score documents are superseded by every resubmission, so losing the older
+# copy loses nothing; duplicates anywhere else are reported and fail startup.
+KEEP_FIRST = {
+    "scores": [("timestamp", DESCENDING), ("_id", DESCENDING)],
+}
+
+# Duplicate groups logged per index before giving up
+MAX_REPORTED_DUPLICATES = 20
+
+
+def _duplicates(collection, fields: List[str], sort: List[tuple]):
+    """Groups of documents sharing a key, each with its _ids in ``sort`` order"""
+    return collection.aggregate([
+        {"$sort": dict(sort)},
+        {"$group": {
+            "_id": {field: f"${field}" for field in fields},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+
+
+async def _remove_duplicates(collection, fields: List[str]) -> int:
+    """Delete all but the first document for each duplicated key"""
+    removed = 0
+    async for group in _duplicates(collection, fields, KEEP_FIRST[collection.name]):
+        result = await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+    return removed
+
+
+async def _report_duplicates(collection, fields: List[str], index: str) -> int:
+    """Log documents that would block a unique index; nothing is deleted"""
+    groups = 0
+    async for group in _duplicates(collection, fields, [("_id", ASCENDING)]):
+        groups += 1
+        if groups <= MAX_REPORTED_DUPLICATES:
+            logger.error("Duplicate %s in %s blocks %s: _ids %s",
+                         group["_id"], collection.name, index, [str(_id) for _id in group["ids"]])
+    if groups > MAX_REPORTED_DUPLICATES:
+        logger.error("... and %d more duplicate keys in %s", groups - MAX_REPORTED_DUPLICATES, collection.name)
+    return groups
+
+
+async def ensure_indexes(db) -> List[str]:
+    """Create any missing indexes; safe to run on every startup. Raises if an
+    index cannot be built"""
+    created = []
+    for name, models in INDEXES.items():
+        collection = db[name]
+        existing = await collection.index_information()
+        missing = [model for model in models if model.document["name"] not in existing]
+        if not missing:
+            continue
+
+        for model in missing:
+            if not model.document.get("unique"):
+                continue
+            fields = list(model.document["key"])
+            if name in KEEP_FIRST:
+                removed = await _remove_duplicates(collection, fields)
+                if removed:
+                    logger.warning("Removed %d duplicate documents from %s before creating %s",
+                                   removed, name, model.document["name"])
+            else:
+                # Left for an operator to resolve; create_indexes fails below
+                await _report_duplicates(collection, fields, model.document["name"])
+
+        try:
+            created += [f"{name}.{index}" for index in await collection.create_indexes(missing)]
+        except OperationFailure as e:
+            # Unique constraints the write paths rely on would be missing, so
+            # startup must not report ready without them
+            logger.error("Failed to create indexes on %s: %s", name, e)
+            raise
+
+    if created:
+        logger.info("Created indexes: %s", ", ".join(created))
+    else:
+        logger.info("All indexes already present")
+    return created
+
+
+async def index_stats(db) -> Dict[str, List[dict]]:
+    """Per-index usage counters reported by $indexStats"""
+    stats = {}
+    for name in INDEXES:
+        stats[name] = [
+            {
+                "name": index["name"],
+                "key": dict(index["key"]),
+                "ops": index["accesses"]["ops"],
+                "since": index["accesses"]["since"].isoformat()
+            }
+            async for index in db[name].aggregate([{"$indexStats": {}}])
+        ]
+    return stats
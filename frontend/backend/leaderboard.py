@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from sortedcontainers import SortedList
+from fast_json import MIN_COMPRESS_SIZE, compress, dumps
+
+
+# Every team with one {judge_id, total} entry per judge that scored it. The
+# criterion scores are summed server-side so a full load is one round trip
+# regardless of how many teams are registered. The equality form of $lookup
+# uses the scores.team_name index on every server version; totals are
+# computed afterwards, since a sub-pipeline alongside localField needs 5.0.
+TEAM_TOTALS_PIPELINE = [
+    {"$project": {"_id": 0, "team_name": 1}},
+    {"$lookup": {
+        "from": "scores",
+        "localField": "team_name",
+        "foreignField": "team_name",
+        "as": "judges"
+    }},
+    {"$project": {
+        "team_name": 1,
+        "judges": {"$map": {
+            "input": "$judges",
+            "as": "score",
+            "in": {
+                "judge_id": "$$score.judge_id",
+                "total": {"$sum": {"$map": {
+                    "input": {"$objectToArray": "$$score.scores"},
+                    "as": "criterion",
+                    "in": "$$criterion.v"
+                }}}
+            }
+        }}
+    }}
+]
+
+
+class LeaderboardRanking:
+    """In-memory leaderboard kept ordered by average score.
+
+    Teams are stored in a sorted container keyed by
+    ``(-average, unscored, seq)`` so scored teams always form a prefix of the
+    ordering and ties keep registration order. A score submission moves one
+    team in O(log n); reads slice a snapshot that is rebuilt lazily once per
+    change.
+    """
+
+    def __init__(self):
+        self._order = SortedList()
+        self._keys: Dict[str, tuple] = {}
+        self._judge_totals: Dict[str, Dict[str, float]] = {}
+        self._next_seq = 0
+        self._scored_count = 0
+        self._snapshot: Optional[List[dict]] = None
+        self.version = 0
+
+    async def rebuild(self, db):
+        """Reload every team and score from Mongo"""
+        rows = await db.teams.aggregate(TEAM_TOTALS_PIPELINE).to_list(None)
+
+        self._order = SortedList()
+        self._keys = {}
+        self._judge_totals = {}
+        self._next_seq = 0
+        self._scored_count = 0
+        for row in rows:
+            self._judge_totals.setdefault(row["team_name"], {}).update(
+                (judge["judge_id"], judge["total"]) for judge in row["judges"]
+            )
+            self.add_team(row["team_name"])
+        self.touch()
+
+    def add_team(self, team_name: str) -> bool:
+        """Register a team so it appears on the leaderboard; False if it
+        already did"""
+        if team_name in self._keys:
+            return False
+        self._insert(team_name, self._next_seq)
+        self._next_seq += 1
+        self.touch()
+        return True
+
+    def set_score(self, team_name: str, judge_id: str, total: float):
+        """Record one judge's summed score for a team"""
+        self._judge_totals.setdefault(team_name, {})[judge_id] = total
+
+        key = self._keys.get(team_name)
+        if key is None:
+            return
+        self._remove(team_name)
+        self._insert(team_name, key[2])
+        self.touch()
+
+    def rank_of(self, team_name: str) -> Optional[int]:
+        """1-based rank of a scored team, or None if it has no scores"""
+        key = self._keys.get(team_name)
+        if key is None or key[1]:
+            return None
+        return self._order.index(key) + 1
+
+    def entries(self, include_unscored: bool = False) -> List[dict]:
+        """Ranked leaderboard rows; unscored teams are only in the admin view"""
+        if self._snapshot is None:
+            self._snapshot = [
+                {
+                    "rank": i + 1,
+                    "team_name": team_name,
+                    "total_score": -neg_avg if not unscored else 0,
+                    "judge_count": len(self._judge_totals.get(team_name, ()))
+                }
+                for i, (neg_avg, unscored, _, team_name) in enumerate(self._order)
+            ]
+        if include_unscored:
+            return self._snapshot
+        return self._snapshot[:self._scored_count]
+
+    def _insert(self, team_name: str, seq: int):
+        totals = self._judge_totals.get(team_name)
+        if totals:
+            average = round(sum(totals.values()) / len(totals), 2)
+            key = (-average, False, seq, team_name)
+            self._scored_count += 1
+        else:
+            key = (0, True, seq, team_name)
+        self._keys[team_name] = key
+        self._order.add(key)
+
+    def _remove(self, team_name: str):
+        key = self._keys.pop(team_name)
+        self._order.remove(key)
+        if not key[1]:
+            self._scored_count -= 1
+
+    def touch(self, version: Optional[int] = None):
+        """Invalidate derived views and move to ``version``, or the next one"""
+        self._snapshot = None
+        self.version = self.version + 1 if version is None else version
+
+
+class LeaderboardCache:
+    """Serialized leaderboard bodies per view, valid for one ranking version.
+
+    Each view ("admin", "judge", "public") is encoded once per version and
+    served with a strong ETag derived from the body bytes. Compressed
+    variants are built on first request for each encoding and cached with
+    the body; each carries its own ETag, since it is a different
+    representation.
+    """
+
+    def __init__(self, ranking: LeaderboardRanking):
+        self._ranking = ranking
+        # view -> (version, {encoding or None: (body, etag)})
+        self._bodies: Dict[str, Tuple[int, Dict[Optional[str], Tuple[bytes, str]]]] = {}
+
+    def get(self, view: str, encoding: Optional[str] = None) -> Tuple[bytes, str, int, Optional[str]]:
+        """Return the body, ETag, ranking version and content encoding for a
+        view; small bodies are returned uncompressed whatever ``encoding``"""
+        cached = self._bodies.get(view)
+        if not cached or cached[0] != self._ranking.version:
+            version = self._ranking.version
+            entries = self._ranking.entries(include_unscored=view == "admin")
+            body = dumps(entries)
+            etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+            cached = self._bodies[view] = (version, {None: (body, etag)})
+
+        version, variants = cached
+        body, etag = variants[None]
+        if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+            return body, etag, version, None
+
+        if encoding not in variants:
+            variants[encoding] = (compress(body, encoding), f'{etag[:-1]}-{encoding}"')
+        body, etag = variants[encoding]
+        return body, etag, version, encoding
+
+
+class LeaderboardBroadcaster:
+    """Pushes leaderboard deltas to WebSocket clients at most once per window.
+
+    The first change after an idle period opens a window of ``window``
+    seconds; every change inside it is folded into a single recompute and a
+    single fan-out when the window closes. Each push carries only the rows
+    whose rank or score changed since the previous push, tagged with the
+    ranking ``version`` it brings a client to and the ``base_version`` it
+    applies on top of. A client whose version is not ``base_version`` (from a
+    missed push, or a REST snapshot taken mid-window) asks for ``snapshot``.
+    """
+
+    def __init__(self, ranking: LeaderboardRanking, manager, window: float = 0.5):
+        self._ranking = ranking
+        self._manager = manager
+        self.window = window
+        self._pending: Optional[asyncio.Task] = None
+        self._published: List[dict] = []
+        self.version = 0
+        self.changes = 0
+        self.broadcasts = 0
+
+    def prime(self):
+        """Take the current ranking as the baseline for the next delta"""
+        self._published = self._ranking.entries()
+        self.version = self._ranking.version
+
+    def snapshot(self) -> dict:
+        """The last pushed leaderboard, consistent with the delta stream"""
+        return {"version": self.version, "entries": self._published}
+
+    def mark_dirty(self):
+        """Schedule a broadcast covering this change"""
+        self.changes += 1
+        if self._pending is None:
+            self._pending = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        # Changes from here on open a new window
+        self._pending = None
+        entries = self._ranking.entries()
+        version = self._ranking.version
+        if version == self.version:
+            return
+
+        previous = {entry["team_name"]: entry for entry in self._published}
+        current = {entry["team_name"] for entry in entries}
+        changes = [entry for entry in entries if previous.get(entry["team_name"]) != entry]
+        removed = [team_name for team_name in previous if team_name not in current]
+        if not changes and not removed:
+            # Nothing visible moved (e.g. a judge re-submitted the same
+            # scores); clients stay on the published version, which the next
+            # real delta builds on
+            return
+
+        delta = {
+            "version": version,
+            "base_version": self.version,
+            "changes": changes,
+            "removed": removed
+        }
+        self._published = entries
+        self.version = version
+        self.broadcasts += 1
+        await self._manager.broadcast_leaderboard_delta(delta)
+
+
+# Global ranking instance
+ranking = LeaderboardRanking()
+leaderboard_cache = LeaderboardCache(ranking)
@@ -0,0 +1,231 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Request latencies in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values):
+        self._values[label_values] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: a count per bucket (non-cumulative), then sum, then count
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def time(self, *label_values) -> "_Timer":
+        return _Timer(self, label_values)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for label_values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, label_values: tuple):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+
+
+class CallbackMetric(Metric):
+    """A value read at scrape time, for state that is already tracked elsewhere.
+
+    ``fn`` returns a number, or a dict keyed by label value (or tuple of label
+    values) when the metric has labels.
+    """
+
+    def __init__(self, name: str, kind: str, help: str, fn: Callable, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        values = self.fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in sorted(values.items(), key=lambda item: str(item[0])):
+            if value is None:
+                continue
+            label_values = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered together in the Prometheus text format.
+
+    Registering a name again returns the existing metric, so modules can
+    declare what they need without coordinating.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(name, lambda: Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(name, lambda: Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help, labels, buckets))
+
+    def callback(self, name: str, kind: str, help: str, fn: Callable, labels: Sequence[str] = ()) -> CallbackMetric:
+        return self._register(name, lambda: CallbackMetric(name, kind, help, fn, labels))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, name: str, create: Callable[[], Metric]):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = create()
+        return metric
+
+
+# Global registry instance
+registry = MetricsRegistry()
+
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope and scope.get("root_path"):
+        # Mounted app such as /uploads; one series for the whole mount
+        return scope["root_path"] + "/{path}"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Counts and times HTTP requests by method and route template.
+
+    Labels use the matched route's path template (``/api/team/{id}``, not
+    the raw URL), so the number of series stays bounded.
+    """
+
+    def __init__(self, app, metrics: Optional[MetricsRegistry] = None):
+        self.app = app
+        metrics = metrics or registry
+        self.requests = metrics.counter("http_requests_total", "HTTP requests by route and status",
+                                        ("method", "route", "status"))
+        self.latency = metrics.histogram("http_request_duration_seconds", "HTTP request latency",
+                                         ("method", "route"))
+        self.in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests being handled")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight.dec()
+            route = route_label(scope)
+            self.requests.inc(scope["method"], route, str(status))
+            self.latency.observe(elapsed, scope["method"], route)
@@ -0,0 +1,76 @@
+import base64
+import binascii
+from typing import Iterable, List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Response
+
+MAX_PAGE_SIZE = 1000
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], always: Iterable[str]) -> Optional[dict]:
+    """Turn a ``fields=a,b`` query parameter into a Mongo projection"""
+    if not fields:
+        return None
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    projection = {"_id": 0}
+    for field in requested | set(always):
+        projection[field] = 1
+    return projection
+
+
+def encode_cursor(value) -> str:
+    """Opaque, header-safe cursor for a key value (team names can be any
+    Unicode, which HTTP headers cannot carry)"""
+    return base64.urlsafe_b64encode(str(value).encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        padded = cursor.encode("ascii") + b"=" * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b"-_", validate=True).decode("utf-8")
+    except (UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def find_page(collection, response: Response, key: str, projection: dict,
+                    after: Optional[str] = None, limit: Optional[int] = None) -> List[dict]:
+    """Keyset-paginated find ordered by ``key``, which must be indexed.
+
+    Without ``limit`` every document is returned. With it, at most ``limit``
+    documents are returned and, if there are more, the ``X-Next-Cursor``
+    response header holds the opaque cursor to pass as ``after`` for the next
+    page. ``_id`` is never returned.
+    """
+    query = {}
+    if after is not None:
+        after = decode_cursor(after)
+        if key == "_id":
+            try:
+                after = ObjectId(after)
+            except InvalidId:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        query[key] = {"$gt": after}
+
+    if key == "_id":
+        # _id is needed for the cursor; it is stripped from the results below
+        projection = {k: v for k, v in projection.items() if k != "_id"} or None
+    cursor = collection.find(query, projection).sort(key, 1)
+
+    if limit is None:
+        docs = await cursor.to_list(None)
+    else:
+        docs = await cursor.limit(limit + 1).to_list(limit + 1)
+        if len(docs) > limit:
+            docs = docs[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(docs[-1][key])
+
+    if key == "_id":
+        for doc in docs:
+            doc.pop("_id", None)
+    return docs
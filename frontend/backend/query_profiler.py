@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from pymongo import monitoring
+from metrics import registry, route_label
+
+logger = logging.getLogger(__name__)
+
+MONGO_COMMAND_SECONDS = registry.histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency",
+    ("command",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+# Commands issued outside any HTTP request: startup, backplane, timers
+BACKGROUND = "(background)"
+
+# (command name, collection, sorted filter keys)
+Shape = Tuple[str, Optional[str], Tuple[str, ...]]
+
+
+class RequestQueries:
+    """Mongo commands issued while handling one HTTP request"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.commands = 0
+        self.seconds = 0.0
+        self.documents = 0
+        self.failed = 0
+        self.shapes: Dict[Shape, int] = {}
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def _shape(command_name: str, command) -> Shape:
+    target = command.get(command_name)
+    collection = target if isinstance(target, str) else command.get("collection")
+    query = command.get("filter") or command.get("query")
+    if query is None and command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or [{}]
+        query = statements[0].get("q")
+    if query is None and command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        query = pipeline[0].get("$match") if pipeline else None
+    keys = tuple(sorted(query)) if isinstance(query, dict) else ()
+    return command_name, collection, keys
+
+
+def _returned(reply) -> int:
+    cursor = reply.get("cursor") if reply else None
+    if not isinstance(cursor, dict):
+        return 0
+    return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Attributes every Mongo command to the HTTP route that issued it.
+
+    Passed to the client through ``event_listeners``. Motor runs PyMongo
+    calls on its executor with a copy of the caller's context, so the
+    per-request accumulator set by ProfilerMiddleware is visible from the
+    listener callbacks. Commands slower than ``slow_ms`` are logged, and a
+    request issuing more than ``n_plus_one`` commands of the same shape
+    (command, collection and filter keys) is flagged as a likely N+1.
+    """
+
+    def __init__(self, slow_ms: float = 100, n_plus_one: int = 10, recent: int = 50):
+        self.slow_ms = slow_ms
+        self.n_plus_one = n_plus_one
+        self._lock = threading.Lock()
+        self._started: Dict[Tuple[int, object], Tuple[Shape, Optional[RequestQueries]]] = {}
+        self.routes: Dict[str, dict] = {}
+        self.slow_commands = deque(maxlen=recent)
+        self.n_plus_one_requests = deque(maxlen=recent)
+
+    # CommandListener callbacks, called on Motor's executor threads
+
+    def started(self, event):
+        shape = _shape(event.command_name, event.command)
+        with self._lock:
+            self._started[(event.request_id, event.connection_id)] = (shape, _current.get())
+
+    def succeeded(self, event):
+        self._finish(event, _returned(event.reply), failed=False)
+
+    def failed(self, event):
+        self._finish(event, 0, failed=True)
+
+    def _finish(self, event, documents: int, failed: bool):
+        seconds = event.duration_micros / 1_000_000
+        with self._lock:
+            MONGO_COMMAND_SECONDS.observe(seconds, event.command_name)
+            started = self._started.pop((event.request_id, event.connection_id), None)
+            if started is None:
+                return
+            shape, request = started
+            if request is not None:
+                request.commands += 1
+                request.seconds += seconds
+                request.documents += documents
+                request.failed += failed
+                request.shapes[shape] = request.shapes.get(shape, 0) + 1
+            else:
+                stats = self._route_stats(BACKGROUND)
+                stats["commands"] += 1
+                stats["command_ms"] += seconds * 1000
+                stats["documents"] += documents
+                stats["failed"] += failed
+
+        if seconds * 1000 >= self.slow_ms:
+            entry = {
+                "path": request.path if request is not None else BACKGROUND,
+                "command": shape[0],
+                "collection": shape[1],
+                "filter_keys": list(shape[2]),
+                "ms": round(seconds * 1000, 2),
+                "documents": documents,
+                "at": time.time()
+            }
+            self.slow_commands.append(entry)
+            logger.warning("Slow Mongo command %s on %s (%s) took %.1f ms in %s",
+                           shape[0], shape[1], ", ".join(shape[2]) or "no filter", seconds * 1000, entry["path"])
+
+    # Per-request bookkeeping, called on the event loop
+
+    def begin(self, path: str):
+        return _current.set(RequestQueries(path))
+
+    def end(self, token, route: str):
+        request = _current.get()
+        _current.reset(token)
+        if request is None:
+            return
+
+        suspects = {shape: count for shape, count in request.shapes.items() if count > self.n_plus_one}
+        with self._lock:
+            stats = self._route_stats(route)
+            stats["requests"] += 1
+            stats["commands"] += request.commands
+            stats["command_ms"] += request.seconds * 1000
+            stats["documents"] += request.documents
+            stats["failed"] += request.failed
+            stats["max_commands"] = max(stats["max_commands"], request.commands)
+            if suspects:
+                stats["n_plus_one"] += 1
+
+        for (command, collection, keys), count in suspects.items():
+            self.n_plus_one_requests.append({
+                "route": route,
+                "command": command,
+                "collection": collection,
+                "filter_keys": list(keys),
+                "count": count,
+                "at": time.time()
+            })
+            logger.warning("Possible N+1 in %s: %d %s commands on %s by (%s)",
+                           route, count, command, collection, ", ".join(keys) or "no filter")
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = {}
+            for route, stats in sorted(self.routes.items()):
+                requests = stats["requests"]
+                routes[route] = {
+                    **stats,
+                    "command_ms": round(stats["command_ms"], 2),
+                    "avg_commands": round(stats["commands"] / requests, 2) if requests else None,
+                    "avg_command_ms": round(stats["command_ms"] / requests, 2) if requests else None
+                }
+        return {
+            "slow_ms": self.slow_ms,
+            "n_plus_one_threshold": self.n_plus_one,
+            "routes": routes,
+            "slow_commands": list(self.slow_commands),
+            "n_plus_one": list(self.n_plus_one_requests)
+        }
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+            self.slow_commands.clear()
+            self.n_plus_one_requests.clear()
+
+    def _route_stats(self, route: str) -> dict:
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = {
+                "requests": 0,
+                "commands": 0,
+                "command_ms": 0.0,
+                "documents": 0,
+                "max_commands": 0,
+                "n_plus_one": 0,
+                "failed": 0
+            }
+        return stats
+
+
+class ProfilerMiddleware:
+    """Opens a query accumulator for each HTTP request"""
+
+    def __init__(self, app, profiler: QueryProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = self.profiler.begin(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(token, route_label(scope))
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+EXPORT_BATCH_SIZE = 500
+CSV_COLUMNS = ["judge_id", "team_name", "criterion", "score", "timestamp"]
+
+# Flush to the client once this much output has accumulated
+CHUNK_SIZE = 64 * 1024
+
+
+def _iso(value: datetime) -> str:
+    # Scores store UTC ISO strings, which compare correctly as text
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def score_query(judge_id: Optional[str] = None, team_name: Optional[str] = None,
+                since: Optional[datetime] = None, until: Optional[datetime] = None) -> dict:
+    query = {}
+    if judge_id:
+        query["judge_id"] = judge_id
+    if team_name:
+        query["team_name"] = team_name
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = _iso(since)
+        if until:
+            query["timestamp"]["$lt"] = _iso(until)
+    return query
+
+
+async def _scores(db, query: dict):
+    cursor = db.scores.find(
+        query,
+        {"_id": 0, "judge_id": 1, "team_name": 1, "scores": 1, "timestamp": 1},
+        batch_size=EXPORT_BATCH_SIZE
+    )
+    async for doc in cursor:
+        yield doc
+
+
+async def stream_ndjson(db, query: dict) -> AsyncIterator[str]:
+    """One JSON object per score document"""
+    buffer = []
+    size = 0
+    async for doc in _scores(db, query):
+        line = json.dumps(doc, separators=(",", ":")) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+async def stream_csv(db, query: dict) -> AsyncIterator[str]:
+    """One row per judge x team x criterion"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    async for doc in _scores(db, query):
+        for criterion, score in (doc.get("scores") or {}).items():
+            writer.writerow([doc.get("judge_id"), doc.get("team_name"), criterion, score, doc.get("timestamp")])
+        if out.tell() >= CHUNK_SIZE:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue()
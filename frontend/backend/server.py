@@ -1,18 +1,35 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, WebSocket, WebSocketDisconnect, File, UploadFile
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, WebSocket, WebSocketDisconnect, File, UploadFile, Request, Response, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+import asyncio
+import json
 import os
 import logging
+import time
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict
+from typing import Awaitable, Callable, List, Optional, Dict
 from datetime import datetime, timezone, timedelta
 import jwt
-from passlib.context import CryptContext
 from websocket_manager import manager
+from leaderboard import ranking, leaderboard_cache, LeaderboardBroadcaster
+from indexes import ensure_indexes, index_stats
+from auth import PasswordHasher, TokenCache
+from config_cache import SingletonConfigCache
+from timer_service import TimerBroadcaster, timer_response
+from backplane import InProcessBackplane, MongoBackplane
+from pagination import MAX_PAGE_SIZE, parse_fields, find_page
+from score_export import score_query, stream_csv, stream_ndjson
+from uploads import ImmutableStaticFiles, UploadLimitMiddleware, UploadTooLarge, save_upload
+from images import ImagePipeline
+from bulk_import import parse_rows, validate_rows, insert_rows
+from metrics import registry, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from query_profiler import QueryProfiler, ProfilerMiddleware
+from fast_json import ResponseCache, dumps, negotiate_encoding
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -20,20 +37,107 @@ load_dotenv(ROOT_DIR / '.env')
 # Setup upload directory
 UPLOAD_DIR = ROOT_DIR / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
 
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Attributes Mongo commands to the request that issued them
+query_profiler = QueryProfiler(
+    slow_ms=float(os.environ.get('MONGO_SLOW_COMMAND_MS', 100)),
+    n_plus_one=int(os.environ.get('MONGO_N_PLUS_ONE_THRESHOLD', 10))
+)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[query_profiler])
 db = client[os.environ['DB_NAME']]
 
+# Per-connection WebSocket outbox limits
+manager.max_queue = int(os.environ.get('WS_SEND_QUEUE_SIZE', 64))
+manager.send_timeout = float(os.environ.get('WS_SEND_TIMEOUT', 10))
+
+# Seconds a signed-in socket has to send its auth message
+WS_AUTH_TIMEOUT = float(os.environ.get('WS_AUTH_TIMEOUT', 10))
+
+# Score submissions inside one window produce a single leaderboard push
+LEADERBOARD_BROADCAST_WINDOW = min(max(float(os.environ.get('LEADERBOARD_BROADCAST_WINDOW_MS', 500)), 250), 2000) / 1000
+leaderboard_broadcaster = LeaderboardBroadcaster(ranking, manager, LEADERBOARD_BROADCAST_WINDOW)
+
+# State changes reach every worker through the backplane; "mongo" is needed
+# when running uvicorn with more than one worker
+if os.environ.get('BROADCAST_BACKPLANE', 'memory') == 'mongo':
+    backplane = MongoBackplane(db, capped_bytes=int(os.environ.get('BACKPLANE_CAPPED_BYTES', 8 * 1024 * 1024)),
+                               gap_timeout=float(os.environ.get('BACKPLANE_GAP_TIMEOUT_SECONDS', 1.0)))
+else:
+    backplane = InProcessBackplane()
+
+# Encoded list responses, invalidated on every worker by backplane events
+team_list_cache = ResponseCache()
+judge_list_cache = ResponseCache()
+criteria_list_cache = ResponseCache()
+
+# Single-document settings, cached in-process and revalidated by version stamp
+CONFIG_REVALIDATE_SECONDS = float(os.environ.get('CONFIG_REVALIDATE_SECONDS', 5))
+timer_config_cache = SingletonConfigCache(db.timer_config, CONFIG_REVALIDATE_SECONDS)
+team_config_cache = SingletonConfigCache(db.team_config, CONFIG_REVALIDATE_SECONDS)
+
+# Countdown pushed over WebSocket instead of polled over REST
+timer_broadcaster = TimerBroadcaster(
+    manager,
+    timer_config_cache.get,
+    sync_interval=float(os.environ.get('TIMER_SYNC_SECONDS', 30))
+)
+
+# Thumbnail and medium WebP copies of team photos, rendered after upload
+image_pipeline = ImagePipeline(workers=int(os.environ.get('IMAGE_POOL_WORKERS', 0)) or None)
+
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # Mount uploads directory for static file serving
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+app.mount("/uploads", ImmutableStaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs in a worker pool so logins never block the event loop
+password_hasher = PasswordHasher(
+    kind=os.environ.get('PASSWORD_POOL', 'thread'),
+    workers=int(os.environ.get('PASSWORD_POOL_WORKERS', 0)) or None,
+    max_concurrency=int(os.environ.get('PASSWORD_POOL_MAX_CONCURRENCY', 0)) or None
+)
+token_cache = TokenCache(
+    max_size=int(os.environ.get('TOKEN_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('TOKEN_CACHE_TTL', 300))
+)
 security = HTTPBearer()
 
+# Scrape-time metrics for state the components already track
+registry.callback("ws_connections", "gauge", "Open WebSocket connections by role",
+                  manager.connections_by_role, ("role",))
+registry.callback("ws_queued_messages", "gauge", "Messages waiting in WebSocket send queues",
+                  manager.queued_messages)
+registry.callback("ws_messages_sent_total", "counter", "WebSocket messages sent",
+                  lambda: manager.messages_sent)
+registry.callback("ws_messages_dropped_total", "counter", "WebSocket messages dropped for slow consumers",
+                  lambda: manager.messages_dropped)
+registry.callback("ws_slow_consumers_dropped_total", "counter", "WebSocket clients disconnected as too slow",
+                  lambda: manager.slow_consumers_dropped)
+registry.callback("backplane_gaps_skipped_total", "counter", "Backplane events given up on as lost",
+                  lambda: backplane.gaps_skipped)
+registry.callback("backplane_resyncs_total", "counter", "Resyncs published after missed backplane events",
+                  lambda: backplane.resyncs)
+LIST_CACHES = {"teams": team_list_cache, "judges": judge_list_cache, "criteria": criteria_list_cache}
+registry.callback("list_cache_hits_total", "counter", "List responses served from the encoded cache",
+                  lambda: {name: cache.hits for name, cache in LIST_CACHES.items()}, ("list",))
+registry.callback("list_cache_misses_total", "counter", "List responses loaded from Mongo and encoded",
+                  lambda: {name: cache.misses for name, cache in LIST_CACHES.items()}, ("list",))
+registry.callback("image_derivatives_pending", "gauge", "Uploads waiting for thumbnail rendering",
+                  lambda: image_pipeline.pending)
+registry.callback("image_derivatives_rendered_total", "counter", "Uploads with derivatives rendered",
+                  lambda: image_pipeline.rendered)
+registry.callback("image_derivatives_failed_total", "counter", "Uploads whose derivatives failed to render",
+                  lambda: image_pipeline.failed)
+registry.callback("password_hash_queued", "gauge", "bcrypt calls waiting for a pool slot",
+                  lambda: password_hasher.queued)
+registry.callback("password_hash_running", "gauge", "bcrypt calls running in the pool",
+                  lambda: password_hasher.running)
+registry.callback("password_hash_seconds_total", "counter", "Time spent in bcrypt calls",
+                  lambda: password_hasher.busy_seconds)
+
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 
@@ -91,10 +195,19 @@ class TeamProfile(BaseModel):
     project_description: Optional[str] = None
     project_url: Optional[str] = None
     photo_url: Optional[str] = None
+    photo_thumb_url: Optional[str] = None
+    photo_medium_url: Optional[str] = None
+
+# Set by the image pipeline only, never by a profile update
+PHOTO_DERIVATIVE_FIELDS = {"photo_thumb_url", "photo_medium_url"}
+
+# Applied idempotency keys remembered per (judge, team) score document
+IDEMPOTENCY_KEYS_KEPT = int(os.environ.get('IDEMPOTENCY_KEYS_KEPT', 50))
 
 class ScoreSubmit(BaseModel):
     team_name: str
     scores: Dict[str, int]
+    idempotency_key: Optional[str] = None
 
 class LeaderboardEntry(BaseModel):
     rank: int
@@ -102,12 +215,18 @@ class LeaderboardEntry(BaseModel):
     total_score: float
     judge_count: int
 
+# Fast-path list endpoints return documents as projected, without response
+# model validation, so these must select exactly the model's fields
+JUDGE_PROJECTION = {"_id": 0, **{field: 1 for field in JudgeResponse.model_fields}}
+CRITERIA_PROJECTION = {"_id": 0, **{field: 1 for field in CriteriaResponse.model_fields}}
+TEAM_PROJECTION = {"_id": 0, **{field: 1 for field in TeamProfile.model_fields}}
+
 # Helper Functions
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
 
 def create_token(data: dict) -> str:
     to_encode = data.copy()
@@ -115,50 +234,219 @@ def create_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+def decode_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is not None:
         return payload
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    token_cache.put(token, payload)
+    return payload
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return decode_token(credentials.credentials)
+
+def require_role(role: str):
+    async def dependency(payload: dict = Depends(verify_token)):
+        if payload.get("role") != role:
+            raise HTTPException(status_code=403, detail=f"{role.capitalize()} access required")
+        return payload
+    return dependency
+
+require_admin = require_role("admin")
+require_judge = require_role("judge")
+require_team = require_role("team")
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def leaderboard_response(request: Request, view: str, cache_control: str) -> Response:
+    if not startup_state["ready"]:
+        # The ranking is still being built; an empty board would look final
+        raise HTTPException(status_code=503, detail="Leaderboard is warming up", headers={"Retry-After": "1"})
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    body, etag, version, encoding = leaderboard_cache.get(view, encoding)
+    headers = {"ETag": etag, "Cache-Control": cache_control, "X-Leaderboard-Version": str(version),
+               "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def handle_event(event: dict):
+    """Apply a backplane event to this worker's caches and sockets.
+
+    A change to the ranking takes the event's sequence number as its version,
+    so every worker reports the same version for the same leaderboard.
+    """
+    kind = event["type"]
+    if kind == "score":
+        ranking.set_score(event["team_name"], event["judge_id"], event["total"])
+        ranking.touch(event["seq"])
+        leaderboard_broadcaster.mark_dirty()
+        await manager.broadcast_score_update({
+            "team_name": event["team_name"],
+            "judge_id": event["judge_id"],
+            "scores": event["scores"],
+            "timestamp": event["timestamp"]
+        })
+    elif kind == "team_changed":
+        team_list_cache.invalidate()
+        # Profile edits do not change the leaderboard; only a new team does
+        if ranking.add_team(event["team_name"]):
+            ranking.touch(event["seq"])
+            leaderboard_broadcaster.mark_dirty()
+    elif kind in ("leaderboard_rebuild", "resync"):
+        if kind == "resync":
+            # Some worker missed events; reload everything they could change
+            timer_config_cache.invalidate()
+            team_config_cache.invalidate()
+            judge_list_cache.invalidate()
+            timer_broadcaster.notify_changed()
+        # Published after bulk team imports and criteria deletion
+        team_list_cache.invalidate()
+        criteria_list_cache.invalidate()
+        await ranking.rebuild(db)
+        ranking.touch(event["seq"])
+        leaderboard_broadcaster.mark_dirty()
+    elif kind == "criteria_changed":
+        criteria_list_cache.invalidate()
+        # Rows are unchanged, but cached leaderboard bodies are revalidated
+        ranking.touch(event["seq"])
+    elif kind == "judges_changed":
+        judge_list_cache.invalidate()
+    elif kind == "timer_changed":
+        timer_config_cache.invalidate()
+        timer_broadcaster.notify_changed()
+    elif kind == "team_config_changed":
+        team_config_cache.invalidate()
+
+# Startup progress, reported by /api/ready
+startup_state = {"ready": False, "error": None, "steps_ms": {}, "retries": 0, "warmup_ms": None}
+
+# A step that fails (e.g. Mongo still starting) is retried with exponential
+# backoff; the warm-up only fails once a step has used every attempt
+WARMUP_ATTEMPTS = int(os.environ.get('WARMUP_ATTEMPTS', 6))
+WARMUP_BACKOFF_SECONDS = float(os.environ.get('WARMUP_BACKOFF_SECONDS', 0.5))
+WARMUP_MAX_BACKOFF_SECONDS = 10
+
+async def timed_step(name: str, step: Callable[[], Awaitable]):
+    started = time.perf_counter()
+    for attempt in range(1, WARMUP_ATTEMPTS + 1):
+        try:
+            await step()
+            break
+        except Exception as e:
+            if attempt == WARMUP_ATTEMPTS:
+                raise
+            delay = min(WARMUP_BACKOFF_SECONDS * 2 ** (attempt - 1), WARMUP_MAX_BACKOFF_SECONDS)
+            startup_state["retries"] += 1
+            logging.warning("Warm-up step %s failed (attempt %d/%d), retrying in %.1fs: %s",
+                            name, attempt, WARMUP_ATTEMPTS, delay, e)
+            await asyncio.sleep(delay)
+    startup_state["steps_ms"][name] = round((time.perf_counter() - started) * 1000, 1)
 
 # Initialize Admin
-@app.on_event("startup")
-async def startup_event():
+async def seed_admin():
     admin_exists = await db.admins.find_one({"username": "admin"})
     if not admin_exists:
-        hashed = hash_password("admin123")
-        await db.admins.insert_one({"username": "admin", "password_hash": hashed})
+        hashed = await hash_password("admin123")
+        try:
+            await db.admins.insert_one({"username": "admin", "password_hash": hashed})
+        except DuplicateKeyError:
+            # Another worker seeded it first
+            return
         logging.info("Default admin created: username=admin, password=admin123")
 
+async def warm_up():
+    """Load everything the request path relies on; independent steps run
+    concurrently, and the leaderboard is built once indexes have deduplicated
+    scores and the backplane is delivering events"""
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            timed_step("mongo_ping", lambda: client.admin.command("ping")),
+            timed_step("indexes", lambda: ensure_indexes(db)),
+            timed_step("timer_config", timer_config_cache.load),
+            timed_step("team_config", team_config_cache.load),
+            timed_step("backplane", lambda: backplane.start(handle_event)),
+            timed_step("admin_seed", seed_admin),
+        )
+        await timed_step("leaderboard", lambda: ranking.rebuild(db))
+        ranking.touch(backplane.seq)
+        leaderboard_broadcaster.prime()
+        timer_broadcaster.start()
+    except Exception as e:
+        startup_state["error"] = str(e)
+        logging.exception("Startup warm-up failed")
+        return
+    startup_state["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    startup_state["ready"] = True
+    logging.info("Ready after %.0f ms warm-up", startup_state["warmup_ms"])
+
+@app.on_event("startup")
+async def startup_event():
+    # Serve /api/health straight away; /api/ready flips once warm-up is done
+    app.state.warm_up = asyncio.create_task(warm_up())
+
+@api_router.get("/health")
+async def health():
+    if startup_state["error"]:
+        raise HTTPException(status_code=503, detail=f"Startup failed: {startup_state['error']}")
+    return {"status": "ok"}
+
+@api_router.get("/ready")
+async def ready():
+    if not startup_state["ready"]:
+        return Response(content=dumps(startup_state), status_code=503, media_type="application/json",
+                        headers={"Retry-After": "1"})
+    return startup_state
+
 # Auth Routes
 @api_router.post("/auth/login", response_model=LoginResponse)
 async def login(req: LoginRequest):
     if req.role == "admin":
         admin = await db.admins.find_one({"username": req.identifier})
-        if not admin or not verify_password(req.password, admin["password_hash"]):
+        if not admin or not await verify_password(req.password, admin["password_hash"]):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         token = create_token({"role": "admin", "identifier": req.identifier})
         return {"token": token, "role": "admin", "identifier": req.identifier}
     
     elif req.role == "judge":
         judge = await db.judges.find_one({"judge_id": req.identifier})
-        if not judge or not verify_password(req.password, judge["password_hash"]):
+        if not judge or not await verify_password(req.password, judge["password_hash"]):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         token = create_token({"role": "judge", "identifier": req.identifier})
         return {"token": token, "role": "judge", "identifier": req.identifier}
     
     elif req.role == "team":
-        team_config = await db.team_config.find_one({})
+        team_config = await team_config_cache.get()
         if not team_config:
             raise HTTPException(status_code=400, detail="Team password not set by admin")
-        if not verify_password(req.password, team_config["password_hash"]):
+        if not await verify_password(req.password, team_config["password_hash"]):
             raise HTTPException(status_code=401, detail="Invalid team password")
-        team = await db.teams.find_one({"team_name": req.identifier})
-        if not team:
-            await db.teams.insert_one({"team_name": req.identifier})
+        # Two devices of a new team can log in at once; only the one whose
+        # upsert created the team announces it
+        try:
+            result = await db.teams.update_one(
+                {"team_name": req.identifier},
+                {"$setOnInsert": {"team_name": req.identifier}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Lost the race on the unique index; the other login created it
+            result = None
+        if result is not None and result.upserted_id is not None:
+            await backplane.publish({"type": "team_changed", "team_name": req.identifier})
         token = create_token({"role": "team", "identifier": req.identifier})
         return {"token": token, "role": "team", "identifier": req.identifier}
     
@@ -166,35 +454,50 @@ async def login(req: LoginRequest):
 
 # Admin Routes
 @api_router.post("/admin/judges", response_model=JudgeResponse)
-async def create_judge(judge: JudgeCreate, payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
+async def create_judge(judge: JudgeCreate, payload: dict = Depends(require_admin)):
     existing = await db.judges.find_one({"judge_id": judge.judge_id})
     if existing:
         raise HTTPException(status_code=400, detail="Judge ID already exists")
     
-    hashed = hash_password(judge.password)
-    await db.judges.insert_one({
-        "judge_id": judge.judge_id,
-        "name": judge.name,
-        "password_hash": hashed
-    })
+    hashed = await hash_password(judge.password)
+    try:
+        await db.judges.insert_one({
+            "judge_id": judge.judge_id,
+            "name": judge.name,
+            "password_hash": hashed
+        })
+    except DuplicateKeyError:
+        # Created concurrently while the password was being hashed
+        raise HTTPException(status_code=400, detail="Judge ID already exists")
+    await backplane.publish({"type": "judges_changed"})
     return {"judge_id": judge.judge_id, "name": judge.name}
 
+@api_router.post("/admin/judges/import")
+async def import_judges(request: Request, payload: dict = Depends(require_admin)):
+    rows = parse_rows(await request.body(), request.headers.get("content-type"))
+    judges = validate_rows(rows, JudgeCreate, "judge_id")
+
+    # Hashed concurrently; the pool bounds how many run at once
+    hashes = await asyncio.gather(*(hash_password(judge.password) for judge in judges))
+    docs = [
+        {"judge_id": judge.judge_id, "name": judge.name, "password_hash": hashed}
+        for judge, hashed in zip(judges, hashes)
+    ]
+    result = await insert_rows(db.judges, docs, "judge_id")
+    if result["inserted"]:
+        await backplane.publish({"type": "judges_changed"})
+    return result
+
 @api_router.get("/admin/judges", response_model=List[JudgeResponse])
-async def get_judges(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    judges = await db.judges.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
-    return judges
+async def get_judges(request: Request, after: Optional[str] = None,
+                     limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                     payload: dict = Depends(require_admin)):
+    return await judge_list_cache.respond(
+        request, lambda response: find_page(db.judges, response, "judge_id", JUDGE_PROJECTION, after, limit)
+    )
 
 @api_router.post("/admin/criteria", response_model=CriteriaResponse)
-async def create_criteria(criteria: CriteriaCreate, payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
+async def create_criteria(criteria: CriteriaCreate, payload: dict = Depends(require_admin)):
     from uuid import uuid4
     criteria_id = str(uuid4())
     await db.criteria.insert_one({
@@ -202,159 +505,170 @@ async def create_criteria(criteria: CriteriaCreate, payload: dict = Depends(veri
         "name": criteria.name,
         "max_score": criteria.max_score
     })
+    await backplane.publish({"type": "criteria_changed"})
     return {"id": criteria_id, "name": criteria.name, "max_score": criteria.max_score}
 
 @api_router.get("/admin/criteria", response_model=List[CriteriaResponse])
-async def get_criteria(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    criteria = await db.criteria.find({}, {"_id": 0}).to_list(1000)
-    return criteria
+async def get_criteria(request: Request, after: Optional[str] = None,
+                       limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                       payload: dict = Depends(require_admin)):
+    # Paged by _id so criteria keep the order they were created in
+    return await criteria_list_cache.respond(
+        request, lambda response: find_page(db.criteria, response, "_id", CRITERIA_PROJECTION, after, limit)
+    )
 
 @api_router.delete("/admin/criteria/{criteria_id}")
-async def delete_criteria(criteria_id: str, payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
+async def delete_criteria(criteria_id: str, payload: dict = Depends(require_admin)):
     result = await db.criteria.delete_one({"id": criteria_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Criteria not found")
+    
+    await backplane.publish({"type": "leaderboard_rebuild"})
     return {"message": "Criteria deleted"}
 
 @api_router.post("/admin/set-team-password")
-async def set_team_password(data: TeamPasswordSet, payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    hashed = hash_password(data.password)
-    await db.team_config.delete_many({})
-    await db.team_config.insert_one({"password_hash": hashed})
+async def set_team_password(data: TeamPasswordSet, payload: dict = Depends(require_admin)):
+    hashed = await hash_password(data.password)
+    await team_config_cache.set({"password_hash": hashed})
+    await backplane.publish({"type": "team_config_changed"})
     return {"message": "Team password set successfully"}
 
 @api_router.post("/admin/timer", response_model=TimerResponse)
-async def set_timer(timer: TimerConfig, payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    await db.timer_config.delete_many({})
-    await db.timer_config.insert_one({
+async def set_timer(timer: TimerConfig, payload: dict = Depends(require_admin)):
+    stored = await timer_config_cache.set({
         "end_time": timer.end_time,
         "is_active": timer.is_active
     })
-    
-    end_dt = datetime.fromisoformat(timer.end_time.replace('Z', '+00:00'))
-    now = datetime.now(timezone.utc)
-    time_remaining = int((end_dt - now).total_seconds()) if timer.is_active else None
-    
-    return {
-        "end_time": timer.end_time,
-        "is_active": timer.is_active,
-        "time_remaining": time_remaining
-    }
+    await backplane.publish({"type": "timer_changed"})
+    return timer_response(stored)
 
 @api_router.get("/admin/timer", response_model=TimerResponse)
-async def get_timer_admin(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    timer = await db.timer_config.find_one({}, {"_id": 0})
-    if not timer:
-        return {"end_time": None, "is_active": False, "time_remaining": None}
-    
-    time_remaining = None
-    if timer.get("is_active"):
-        end_dt = datetime.fromisoformat(timer["end_time"].replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-        time_remaining = int((end_dt - now).total_seconds())
-    
+async def get_timer_admin(payload: dict = Depends(require_admin)):
+    return timer_response(await timer_config_cache.get())
+
+@api_router.get("/admin/leaderboard", response_model=List[LeaderboardEntry])
+async def get_admin_leaderboard(request: Request, payload: dict = Depends(require_admin)):
+    return leaderboard_response(request, "admin", "private, no-cache")
+
+@api_router.post("/admin/leaderboard/rebuild")
+async def rebuild_leaderboard(payload: dict = Depends(require_admin)):
+    await backplane.publish({"type": "leaderboard_rebuild"})
+    return {"message": "Leaderboard rebuilt"}
+
+@api_router.get("/admin/indexes")
+async def get_index_stats(payload: dict = Depends(require_admin)):
+    return await index_stats(db)
+
+@api_router.get("/admin/auth/stats")
+async def get_auth_stats(payload: dict = Depends(require_admin)):
     return {
-        "end_time": timer.get("end_time"),
-        "is_active": timer.get("is_active", False),
-        "time_remaining": time_remaining
+        "password_pool": password_hasher.stats(),
+        "token_cache": token_cache.stats()
     }
 
-@api_router.get("/admin/leaderboard", response_model=List[LeaderboardEntry])
-async def get_admin_leaderboard(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    teams = await db.teams.find({}, {"_id": 0}).to_list(1000)
-    leaderboard = []
-    
-    for team in teams:
-        scores = await db.scores.find({"team_name": team["team_name"]}, {"_id": 0}).to_list(1000)
-        if scores:
-            total = sum(sum(s["scores"].values()) for s in scores)
-            avg_score = total / len(scores)
-            leaderboard.append({
-                "team_name": team["team_name"],
-                "total_score": round(avg_score, 2),
-                "judge_count": len(scores)
-            })
-        else:
-            leaderboard.append({
-                "team_name": team["team_name"],
-                "total_score": 0,
-                "judge_count": 0
-            })
-    
-    leaderboard.sort(key=lambda x: x["total_score"], reverse=True)
-    for i, entry in enumerate(leaderboard):
-        entry["rank"] = i + 1
-    
-    return leaderboard
+@api_router.get("/admin/images/stats")
+async def get_image_stats(payload: dict = Depends(require_admin)):
+    return image_pipeline.stats()
+
+@api_router.get("/admin/diagnostics/queries")
+async def get_query_diagnostics(payload: dict = Depends(require_admin)):
+    return query_profiler.stats()
+
+@api_router.delete("/admin/diagnostics/queries")
+async def reset_query_diagnostics(payload: dict = Depends(require_admin)):
+    query_profiler.reset()
+    return {"message": "Query diagnostics reset"}
+
+@api_router.get("/admin/export/scores")
+async def export_scores(format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+                        judge_id: Optional[str] = None, team_name: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        payload: dict = Depends(require_admin)):
+    query = score_query(judge_id, team_name, since, until)
+    if format == "csv":
+        body, media_type = stream_csv(db, query), "text/csv"
+    else:
+        body, media_type = stream_ndjson(db, query), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="scores.{format}"'}
+    )
 
-@api_router.get("/admin/teams", response_model=List[TeamProfile])
-async def get_all_teams(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    teams = await db.teams.find({}, {"_id": 0}).to_list(1000)
-    return teams
+@api_router.get("/admin/teams", response_model=List[TeamProfile], response_model_exclude_unset=True)
+async def get_all_teams(request: Request, after: Optional[str] = None,
+                        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                        fields: Optional[str] = None, payload: dict = Depends(require_admin)):
+    projection = parse_fields(fields, TeamProfile.model_fields, ["team_name"]) or TEAM_PROJECTION
+    return await team_list_cache.respond(
+        request, lambda response: find_page(db.teams, response, "team_name", projection, after, limit)
+    )
+
+@api_router.post("/admin/teams/import")
+async def import_teams(request: Request, payload: dict = Depends(require_admin)):
+    rows = parse_rows(await request.body(), request.headers.get("content-type"), list_fields=("members",))
+    teams = validate_rows(rows, TeamProfile, "team_name")
+    docs = [team.model_dump(exclude_none=True, exclude=PHOTO_DERIVATIVE_FIELDS) for team in teams]
+    result = await insert_rows(db.teams, docs, "team_name")
+
+    # One rebuild rather than an event per team
+    if result["inserted"]:
+        await backplane.publish({"type": "leaderboard_rebuild"})
+    return result
 
 # Judge Routes
-@api_router.get("/judge/teams", response_model=List[TeamProfile])
-async def get_teams_for_judge(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "judge":
-        raise HTTPException(status_code=403, detail="Judge access required")
-    
-    teams = await db.teams.find({}, {"_id": 0}).to_list(1000)
-    return teams
+@api_router.get("/judge/teams", response_model=List[TeamProfile], response_model_exclude_unset=True)
+async def get_teams_for_judge(request: Request, after: Optional[str] = None,
+                              limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                              fields: Optional[str] = None, payload: dict = Depends(require_judge)):
+    projection = parse_fields(fields, TeamProfile.model_fields, ["team_name"]) or TEAM_PROJECTION
+    return await team_list_cache.respond(
+        request, lambda response: find_page(db.teams, response, "team_name", projection, after, limit)
+    )
 
 @api_router.get("/judge/criteria", response_model=List[CriteriaResponse])
-async def get_criteria_for_judge(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "judge":
-        raise HTTPException(status_code=403, detail="Judge access required")
-    
-    criteria = await db.criteria.find({}, {"_id": 0}).to_list(1000)
-    return criteria
+async def get_criteria_for_judge(request: Request, after: Optional[str] = None,
+                                 limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                                 payload: dict = Depends(require_judge)):
+    return await criteria_list_cache.respond(
+        request, lambda response: find_page(db.criteria, response, "_id", CRITERIA_PROJECTION, after, limit)
+    )
 
 @api_router.post("/judge/score")
-async def submit_score(score_data: ScoreSubmit, payload: dict = Depends(verify_token)):
-    if payload.get("role") != "judge":
-        raise HTTPException(status_code=403, detail="Judge access required")
-    
+async def submit_score(score_data: ScoreSubmit, payload: dict = Depends(require_judge)):
     judge_id = payload.get("identifier")
-    existing = await db.scores.find_one({"judge_id": judge_id, "team_name": score_data.team_name})
-    
-    if existing:
-        await db.scores.update_one(
-            {"judge_id": judge_id, "team_name": score_data.team_name},
-            {"$set": {"scores": score_data.scores, "timestamp": datetime.now(timezone.utc).isoformat()}}
-        )
-    else:
-        await db.scores.insert_one({
-            "judge_id": judge_id,
-            "team_name": score_data.team_name,
-            "scores": score_data.scores,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
+    query = {"judge_id": judge_id, "team_name": score_data.team_name}
+    update = {"$set": {
+        "scores": score_data.scores,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }}
+    if score_data.idempotency_key:
+        # A retry carrying any recently applied key matches nothing and is
+        # skipped; the newest keys are kept so a late replay of an older
+        # submission cannot overwrite a newer score
+        query["idempotency_keys"] = {"$ne": score_data.idempotency_key}
+        update["$push"] = {"idempotency_keys": {
+            "$each": [score_data.idempotency_key],
+            "$slice": -IDEMPOTENCY_KEYS_KEPT
+        }}
     
-    # Broadcast score update to all connected clients
-    await manager.broadcast_score_update({
+    try:
+        await db.scores.update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        # The unique (judge_id, team_name) index rejected the upsert's insert:
+        # either a concurrent first submission won the race or this is a
+        # replayed idempotency key. A plain update settles both.
+        result = await db.scores.update_one(query, update)
+        if result.matched_count == 0:
+            return {"message": "Score submitted successfully"}
+    
+    # Every worker updates its ranking and queues the update for its sockets;
+    # delivery to clients is not awaited
+    await backplane.publish({
+        "type": "score",
         "team_name": score_data.team_name,
         "judge_id": judge_id,
+        "total": sum(score_data.scores.values()),
         "scores": score_data.scores,
         "timestamp": datetime.now(timezone.utc).isoformat()
     })
@@ -362,36 +676,12 @@ async def submit_score(score_data: ScoreSubmit, payload: dict = Depends(verify_t
     return {"message": "Score submitted successfully"}
 
 @api_router.get("/judge/leaderboard", response_model=List[LeaderboardEntry])
-async def get_judge_leaderboard(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "judge":
-        raise HTTPException(status_code=403, detail="Judge access required")
-    
-    teams = await db.teams.find({}, {"_id": 0}).to_list(1000)
-    leaderboard = []
-    
-    for team in teams:
-        scores = await db.scores.find({"team_name": team["team_name"]}, {"_id": 0}).to_list(1000)
-        if scores:
-            total = sum(sum(s["scores"].values()) for s in scores)
-            avg_score = total / len(scores)
-            leaderboard.append({
-                "team_name": team["team_name"],
-                "total_score": round(avg_score, 2),
-                "judge_count": len(scores)
-            })
-    
-    leaderboard.sort(key=lambda x: x["total_score"], reverse=True)
-    for i, entry in enumerate(leaderboard):
-        entry["rank"] = i + 1
-    
-    return leaderboard
+async def get_judge_leaderboard(request: Request, payload: dict = Depends(require_judge)):
+    return leaderboard_response(request, "judge", "private, no-cache")
 
 # Team Routes
 @api_router.get("/team/profile", response_model=TeamProfile)
-async def get_team_profile(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "team":
-        raise HTTPException(status_code=403, detail="Team access required")
-    
+async def get_team_profile(payload: dict = Depends(require_team)):
     team_name = payload.get("identifier")
     team = await db.teams.find_one({"team_name": team_name}, {"_id": 0})
     if not team:
@@ -399,32 +689,27 @@ async def get_team_profile(payload: dict = Depends(verify_token)):
     return team
 
 @api_router.put("/team/profile", response_model=TeamProfile)
-async def update_team_profile(profile: TeamProfile, payload: dict = Depends(verify_token)):
-    if payload.get("role") != "team":
-        raise HTTPException(status_code=403, detail="Team access required")
-    
+async def update_team_profile(profile: TeamProfile, payload: dict = Depends(require_team)):
     team_name = payload.get("identifier")
     if profile.team_name != team_name:
         raise HTTPException(status_code=400, detail="Cannot change team name")
     
     await db.teams.update_one(
         {"team_name": team_name},
-        {"$set": profile.model_dump()},
+        {"$set": profile.model_dump(exclude=PHOTO_DERIVATIVE_FIELDS)},
         upsert=True
     )
+    await backplane.publish({"type": "team_changed", "team_name": team_name})
     
     return profile
 
 @api_router.get("/team/score")
-async def get_team_score(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "team":
-        raise HTTPException(status_code=403, detail="Team access required")
-    
+async def get_team_score(payload: dict = Depends(require_team)):
     team_name = payload.get("identifier")
-    scores = await db.scores.find({"team_name": team_name}, {"_id": 0}).to_list(1000)
+    scores = await db.scores.find({"team_name": team_name}, {"_id": 0, "idempotency_keys": 0}).to_list(1000)
     
     if not scores:
-        return {"total_score": 0, "judge_count": 0, "breakdown": []}
+        return {"total_score": 0, "judge_count": 0, "rank": None, "breakdown": []}
     
     total = sum(sum(s["scores"].values()) for s in scores)
     avg_score = total / len(scores)
@@ -432,111 +717,151 @@ async def get_team_score(payload: dict = Depends(verify_token)):
     return {
         "total_score": round(avg_score, 2),
         "judge_count": len(scores),
+        "rank": ranking.rank_of(team_name),
         "breakdown": scores
     }
 
 @api_router.get("/team/timer", response_model=TimerResponse)
-async def get_team_timer(payload: dict = Depends(verify_token)):
-    if payload.get("role") != "team":
-        raise HTTPException(status_code=403, detail="Team access required")
-    
-    timer = await db.timer_config.find_one({}, {"_id": 0})
-    if not timer:
-        return {"end_time": None, "is_active": False, "time_remaining": None}
-    
-    time_remaining = None
-    if timer.get("is_active"):
-        end_dt = datetime.fromisoformat(timer["end_time"].replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-        time_remaining = int((end_dt - now).total_seconds())
-    
-    return {
-        "end_time": timer.get("end_time"),
-        "is_active": timer.get("is_active", False),
-        "time_remaining": time_remaining
-    }
+async def get_team_timer(payload: dict = Depends(require_team)):
+    return timer_response(await timer_config_cache.get())
 
 @api_router.post("/team/upload-photo")
-async def upload_photo(file: UploadFile = File(...), payload: dict = Depends(verify_token)):
-    if payload.get("role") != "team":
-        raise HTTPException(status_code=403, detail="Team access required")
-    
+async def upload_photo(file: UploadFile = File(...), payload: dict = Depends(require_team)):
     # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/webp"]
+    allowed_types = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Invalid file type. Allowed: JPG, PNG, WebP")
     
-    # Validate file size (5MB)
-    contents = await file.read()
-    if len(contents) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large. Max size: 5MB")
-    
-    # Save file
     team_name = payload.get("identifier")
-    # Sanitize filename
-    filename = f"{team_name}_{file.filename}".replace(" ", "_")
-    filepath = UPLOAD_DIR / filename
     
+    # Streamed to disk in chunks and stored under its content hash, so the URL
+    # changes whenever the image does; rejected as soon as it passes 5MB
     try:
-        with open(filepath, "wb") as f:
-            f.write(contents)
-    except Exception as e:
+        filename = await save_upload(file, UPLOAD_DIR, allowed_types[file.content_type], MAX_UPLOAD_BYTES)
+    except UploadTooLarge:
+        raise HTTPException(status_code=400, detail="File too large. Max size: 5MB")
+    except OSError as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
-    # Update team profile with photo URL
+    # Update team profile with photo URL; derivatives of any previous photo
+    # no longer apply until the new ones are rendered
     photo_url = f"/uploads/{filename}"
     await db.teams.update_one(
         {"team_name": team_name},
-        {"$set": {"photo_url": photo_url}},
+        {"$set": {"photo_url": photo_url}, "$unset": {field: "" for field in PHOTO_DERIVATIVE_FIELDS}},
         upsert=True
     )
+    await backplane.publish({"type": "team_changed", "team_name": team_name})
+
+    async def record_derivatives(filenames: Dict[str, str]):
+        # Skipped if the team uploaded another photo in the meantime
+        result = await db.teams.update_one(
+            {"team_name": team_name, "photo_url": photo_url},
+            {"$set": {f"photo_{name}_url": f"/uploads/{derived}" for name, derived in filenames.items()}}
+        )
+        if result.modified_count:
+            await backplane.publish({"type": "team_changed", "team_name": team_name})
+
+    filepath = UPLOAD_DIR / filename
+    image_pipeline.schedule(filepath, filepath.stem, record_derivatives)
     
     return {"photo_url": photo_url, "message": "Photo uploaded successfully"}
 
 @api_router.get("/public/leaderboard", response_model=List[LeaderboardEntry])
-async def get_public_leaderboard():
-    teams = await db.teams.find({}, {"_id": 0}).to_list(1000)
-    leaderboard = []
-    
-    for team in teams:
-        scores = await db.scores.find({"team_name": team["team_name"]}, {"_id": 0}).to_list(1000)
-        if scores:
-            total = sum(sum(s["scores"].values()) for s in scores)
-            avg_score = total / len(scores)
-            leaderboard.append({
-                "team_name": team["team_name"],
-                "total_score": round(avg_score, 2),
-                "judge_count": len(scores)
-            })
-    
-    leaderboard.sort(key=lambda x: x["total_score"], reverse=True)
-    for i, entry in enumerate(leaderboard):
-        entry["rank"] = i + 1
-    
-    return leaderboard
+async def get_public_leaderboard(request: Request):
+    return leaderboard_response(request, "public", "public, no-cache")
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    # Unauthenticated unless METRICS_TOKEN is set, as most scrapers expect
+    token = os.environ.get('METRICS_TOKEN')
+    if token and request.headers.get("authorization") != f"Bearer {token}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 # WebSocket Endpoint
-@app.websocket("/ws/{user_id}/{role}")
-async def websocket_endpoint(websocket: WebSocket, user_id: str, role: str):
-    """WebSocket endpoint for real-time updates"""
+async def authenticate_websocket(websocket: WebSocket) -> Optional[dict]:
+    """Read the ``{"action": "auth", "token": ...}`` message a signed-in client
+    sends first; the token is kept out of the URL, which access logs record"""
+    try:
+        message = json.loads(await asyncio.wait_for(websocket.receive_text(), WS_AUTH_TIMEOUT))
+        if message.get("action") != "auth" or not isinstance(message.get("token"), str):
+            return None
+        payload = decode_token(message["token"])
+    except (asyncio.TimeoutError, ValueError, KeyError, AttributeError, HTTPException):
+        return None
+    if payload.get("role") not in ("admin", "judge", "team"):
+        return None
+    return payload
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """WebSocket endpoint for signed-in users, authenticated by their first message"""
+    # Accepted first so a rejected client sees 1008 rather than a failed handshake
+    await websocket.accept()
+    try:
+        payload = await authenticate_websocket(websocket)
+    except WebSocketDisconnect:
+        return
+    if payload is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    # Role and identity come from the signed token, never from the client
+    await serve_websocket(websocket, payload["identifier"], payload["role"])
+
+@app.websocket("/ws/public")
+async def public_websocket_endpoint(websocket: WebSocket):
+    """Anonymous leaderboard and timer updates for the public page"""
+    await serve_websocket(websocket, "public", "public")
+
+async def serve_websocket(websocket: WebSocket, user_id: str, role: str):
     await manager.connect(websocket, user_id, role)
     try:
+        await manager.send_timer_snapshot(websocket, await timer_broadcaster.snapshot())
         while True:
             data = await websocket.receive_text()
-            # Handle incoming messages if needed
+            for topic in manager.handle_client_message(websocket, data):
+                if topic == "timer":
+                    await manager.send_timer_snapshot(websocket, await timer_broadcaster.snapshot())
+                elif topic == "leaderboard":
+                    await manager.send_leaderboard_snapshot(websocket, leaderboard_broadcaster.snapshot())
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Also on unexpected errors, so the socket leaves the topic index
         manager.disconnect(websocket, user_id, role)
 
 app.include_router(api_router)
 
+def upload_authorized(headers) -> bool:
+    """Cheap pre-check of the team token, before an upload slot is taken"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        return decode_token(token).get("role") == "team"
+    except HTTPException:
+        return False
+
+# Upload slots are taken here, before the body is read and spooled
+app.add_middleware(UploadLimitMiddleware, paths=["/api/team/upload-photo"], max_bytes=MAX_UPLOAD_BYTES,
+                   max_concurrency=int(os.environ.get('MAX_CONCURRENT_UPLOADS', 8)),
+                   authorize=upload_authorized)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Leaderboard-Version", "X-Next-Cursor"],
 )
 
+app.add_middleware(ProfilerMiddleware, profiler=query_profiler)
+
+# Outermost, so latency includes the other middleware
+app.add_middleware(MetricsMiddleware)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -545,4 +870,9 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    app.state.warm_up.cancel()
+    await timer_broadcaster.stop()
+    await backplane.stop()
+    client.close()
+    password_hasher.shutdown()
+    image_pipeline.shutdown()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=16)
+def parse_end_time(end_time: str) -> datetime:
+    return datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+
+def timer_response(timer: Optional[dict]) -> dict:
+    if not timer:
+        return {"end_time": None, "is_active": False, "time_remaining": None}
+
+    time_remaining = None
+    if timer.get("is_active"):
+        now = datetime.now(timezone.utc)
+        time_remaining = int((parse_end_time(timer["end_time"]) - now).total_seconds())
+
+    return {
+        "end_time": timer.get("end_time"),
+        "is_active": timer.get("is_active", False),
+        "time_remaining": time_remaining
+    }
+
+
+class TimerBroadcaster:
+    """Pushes countdown state to WebSocket clients so they never poll.
+
+    Clients get a snapshot on connect (see ``snapshot``), a push whenever the
+    admin changes the timer, a re-sync every ``sync_interval`` seconds while
+    it is running, and a single ``timer_ended`` event at the deadline.
+    """
+
+    def __init__(self, manager, load_timer: Callable[[], Awaitable[Optional[dict]]],
+                 sync_interval: float = 30):
+        self._manager = manager
+        self._load_timer = load_timer
+        self.sync_interval = sync_interval
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._ended_for: Optional[str] = None
+
+    async def snapshot(self) -> dict:
+        return timer_response(await self._load_timer())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify_changed(self):
+        """Broadcast the new state and reschedule the deadline"""
+        self._changed.set()
+
+    async def _run(self):
+        changed = False
+        while True:
+            self._changed.clear()
+            try:
+                timeout = await self._tick(changed)
+            except Exception:
+                logger.exception("Timer broadcast failed")
+                timeout = self.sync_interval
+
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+                changed = True
+            except asyncio.TimeoutError:
+                changed = False
+
+    async def _tick(self, changed: bool) -> Optional[float]:
+        """Send whatever is due and return how long to sleep"""
+        timer = await self._load_timer()
+        if not timer or not timer.get("is_active"):
+            if changed:
+                await self._manager.broadcast_timer_update(timer_response(timer))
+            return None
+
+        remaining = (parse_end_time(timer["end_time"]) - datetime.now(timezone.utc)).total_seconds()
+        if remaining <= 0:
+            if self._ended_for != timer["end_time"]:
+                self._ended_for = timer["end_time"]
+                await self._manager.broadcast_timer_update(timer_response(timer), ended=True)
+            elif changed:
+                await self._manager.broadcast_timer_update(timer_response(timer))
+            return None
+
+        await self._manager.broadcast_timer_update(timer_response(timer))
+        return min(self.sync_interval, remaining)
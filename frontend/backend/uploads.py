@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+import anyio
+from fastapi import UploadFile
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# Slack for multipart boundaries and headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def _discard(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _write_chunk(out, digest, chunk: bytes):
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _store(tmp_path: str, dest: Path) -> bool:
+    # Identical content is already stored under the same name: keep that copy
+    if dest.exists():
+        _discard(tmp_path)
+        return False
+    os.replace(tmp_path, dest)
+    return True
+
+
+async def save_upload(file: UploadFile, upload_dir: Path, suffix: str, max_bytes: int) -> str:
+    """Stream an upload into ``upload_dir`` under its SHA-256, returning the filename.
+
+    Chunks are hashed and written to a temp file off the event loop, then the
+    temp file is atomically renamed to ``<sha256><suffix>``, so readers never
+    see a partial file and identical uploads are stored once. Raises
+    UploadTooLarge as soon as ``max_bytes`` is passed.
+    """
+    fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, dir=upload_dir, prefix=".upload-")
+    out = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge()
+            await run_in_threadpool(_write_chunk, out, digest, chunk)
+        await run_in_threadpool(out.close)
+        filename = f"{digest.hexdigest()}{suffix}"
+        await run_in_threadpool(_store, tmp_path, upload_dir / filename)
+    except BaseException:
+        out.close()
+        _discard(tmp_path)
+        raise
+    return filename
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive offsets.
+
+    Returns None for anything we do not serve partially (multiple ranges,
+    other units, malformed values), which falls back to the full file.
+    Raises ValueError when the range lies entirely past the end, or the
+    file is empty.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if size == 0:
+        # No byte range of an empty file is satisfiable
+        raise ValueError(header)
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+class _PartialFileResponse(FileResponse):
+    """206 response carrying one byte range of a file"""
+
+    def __init__(self, path, stat_result: os.stat_result, start: int, end: int):
+        super().__init__(path, status_code=206, stat_result=stat_result)
+        self.start = start
+        self.end = end
+        self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        remaining = 0 if scope["method"] == "HEAD" else self.end - self.start + 1
+        if remaining:
+            async with await anyio.open_file(self.path, mode="rb") as f:
+                await f.seek(self.start)
+                while remaining:
+                    chunk = await f.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining or scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+# <sha256>.<ext> or <sha256>.<derivative>.webp
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{64}\.")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for content-addressed uploads.
+
+    A content-addressed file never changes, so it is served with an immutable,
+    year-long Cache-Control and its hash as a strong ETag, and single byte
+    ranges are honoured. Files with other names (uploads stored before
+    content addressing) keep the default, revalidated headers.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        name = os.path.basename(full_path)
+        if status_code != 200 or not CONTENT_ADDRESSED.match(name):
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, stat_result=stat_result)
+        response.headers["etag"] = f'"{name}"'
+        response.headers["cache-control"] = IMMUTABLE
+        response.headers["accept-ranges"] = "bytes"
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (if_range is None or if_range == response.headers["etag"]):
+            try:
+                byte_range = _parse_range(range_header, stat_result.st_size)
+            except ValueError:
+                return Response(status_code=416, headers={
+                    "content-range": f"bytes */{stat_result.st_size}",
+                    "cache-control": IMMUTABLE
+                })
+            if byte_range is not None:
+                partial = _PartialFileResponse(full_path, stat_result, *byte_range)
+                for header in ("etag", "cache-control", "accept-ranges"):
+                    partial.headers[header] = response.headers[header]
+                return partial
+        return response
+
+
+class UploadLimitMiddleware:
+    """Bounds upload requests before the multipart body is spooled.
+
+    Requests that ``authorize`` (given the request headers) refuses get a
+    401 straight away, so anonymous clients cannot hold upload slots. Each
+    other request waits for one of ``max_concurrency`` slots before any of
+    its body is read. A Content-Length over the limit is refused up front;
+    otherwise the body is counted as it is received, so chunked uploads
+    without a length are cut off with a 413 as soon as they pass it. The
+    app then sees a disconnect and whatever it sends is discarded.
+    """
+
+    def __init__(self, app, paths, max_bytes: int, max_concurrency: int = 8,
+                 authorize: Optional[Callable[[Headers], bool]] = None):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+        self.limit = max_bytes + MULTIPART_OVERHEAD
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self.authorize is not None and not self.authorize(Headers(scope=scope)):
+            await self._respond(send, 401, b"Not authenticated")
+            return
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.limit:
+            await self._reject(send)
+            return
+
+        received = 0
+        rejected = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit and not started:
+                    rejected = True
+                    await self._reject(send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if rejected:
+                return
+            started = True
+            await send(message)
+
+        async with self.slots:
+            try:
+                await self.app(scope, limited_receive, guarded_send)
+            except Exception:
+                # The app failing on the cut-off body is expected
+                if not rejected:
+                    raise
+
+    async def _reject(self, send):
+        await self._respond(send, 413, b"File too large. Max size: %dMB" % (self.max_bytes // (1024 * 1024)))
+
+    async def _respond(self, send, status: int, detail: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")]
+        })
+        await send({
+            "type": "http.response.body",
+            "body": b'{"detail":"%s"}' % detail
+        })
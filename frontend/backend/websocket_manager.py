@@ -1,101 +1,270 @@
-from typing import Set, Dict
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import WebSocket
-from datetime import datetime
+from starlette.websockets import WebSocketState
+from datetime import datetime, timezone
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_SECONDS = registry.histogram(
+    "ws_broadcast_duration_seconds",
+    "Time to fan a message out to subscriber queues",
+    ("type",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+)
+
+
+class ClientConnection:
+    """A connected socket with its own bounded outbox and writer task"""
+
+    def __init__(self, websocket: WebSocket, user_id: str, role: str, max_queue: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.role = role
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.needs_resync = False
+        self.topics: Set[str] = set()
+        self.writer: Optional[asyncio.Task] = None
+
+    def may_subscribe(self, topic: str) -> bool:
+        """Teams and judges may only follow their own private topic"""
+        if topic in ("leaderboard", "timer"):
+            return True
+        if self.role == "admin":
+            return topic == "scores" or topic.startswith(("team:", "judge:"))
+        return topic == f"{self.role}:{self.user_id}" and self.role in ("team", "judge")
+
+
+# Topics every new connection starts with, by role
+DEFAULT_TOPICS = {
+    "admin": ["leaderboard", "timer", "scores"],
+    "judge": ["leaderboard", "timer", "judge:{user_id}"],
+    "team": ["leaderboard", "timer", "team:{user_id}"],
+}
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time updates"""
-    
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
-        self.judge_connections: Dict[str, WebSocket] = {}
-        self.team_connections: Dict[str, WebSocket] = {}
-    
+    """Manages WebSocket connections for real-time updates.
+
+    Connections are indexed by topic (``leaderboard``, ``timer``, ``scores``,
+    ``team:<name>``, ``judge:<id>``) so a publish only touches subscribers.
+    Clients start with their role's default topics and can change them with
+    ``{"action": "subscribe" | "unsubscribe", "topics": [...]}`` messages.
+
+    Broadcasts only enqueue: every connection has a bounded send queue drained
+    by its own writer task, so one stalled client never delays the others or
+    the request that triggered the broadcast. A client whose queue overflows
+    has its backlog replaced by a single ``resync_required`` message (it should
+    refetch a snapshot over REST); if it overflows again before catching up,
+    or a send exceeds ``send_timeout``, it is disconnected.
+    """
+
+    def __init__(self, max_queue: int = 64, send_timeout: float = 10.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.topics: Dict[str, Set[ClientConnection]] = {}
+
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.slow_consumers_dropped = 0
+
     async def connect(self, websocket: WebSocket, user_id: str, role: str):
-        """Accept and register a new WebSocket connection"""
-        await websocket.accept()
-        self.active_connections.add(websocket)
-        
-        if role == "judge":
-            self.judge_connections[user_id] = websocket
-        elif role == "team":
-            self.team_connections[user_id] = websocket
-    
+        """Accept (unless the endpoint already did) and register a WebSocket"""
+        if websocket.client_state == WebSocketState.CONNECTING:
+            await websocket.accept()
+        client = ClientConnection(websocket, user_id, role, self.max_queue)
+        client.writer = asyncio.create_task(self._writer(client))
+        self.active_connections[websocket] = client
+        self.subscribe(websocket, [topic.format(user_id=user_id)
+                                   for topic in DEFAULT_TOPICS.get(role, ["leaderboard"])])
+
     def disconnect(self, websocket: WebSocket, user_id: str, role: str):
         """Remove a disconnected WebSocket"""
-        self.active_connections.discard(websocket)
-        
-        if role == "judge" and user_id in self.judge_connections:
-            del self.judge_connections[user_id]
-        elif role == "team" and user_id in self.team_connections:
-            del self.team_connections[user_id]
-    
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        if client.writer is not None:
+            client.writer.cancel()
+        self._remove_topics(client, list(client.topics))
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Add topics to a connection; returns (newly added, rejected)"""
+        client = self.active_connections.get(websocket)
+        added, rejected = [], []
+        if client is None:
+            return added, rejected
+        for topic in topics:
+            if not isinstance(topic, str) or not client.may_subscribe(topic):
+                rejected.append(topic)
+            elif topic not in client.topics:
+                client.topics.add(topic)
+                self.topics.setdefault(topic, set()).add(client)
+                added.append(topic)
+        return added, rejected
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]):
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            self._remove_topics(client, [t for t in topics if isinstance(t, str) and t in client.topics])
+
+    def connections_by_role(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for client in self.active_connections.values():
+            counts[client.role] = counts.get(client.role, 0) + 1
+        return counts
+
+    def queued_messages(self) -> int:
+        return sum(client.queue.qsize() for client in self.active_connections.values())
+
+    def handle_client_message(self, websocket: WebSocket, text: str) -> List[str]:
+        """Apply a client request; returns the topics that need a fresh snapshot.
+
+        Accepts subscribe/unsubscribe, and ``{"action": "snapshot", "topics":
+        [...]}`` from a client that detected a gap in a delta stream.
+        """
+        try:
+            request = json.loads(text)
+            action, topics = request["action"], list(request.get("topics", []))
+        except (ValueError, KeyError, TypeError):
+            return []
+
+        client = self.active_connections.get(websocket)
+        if action == "snapshot":
+            return [topic for topic in topics
+                    if client is not None and isinstance(topic, str) and topic in client.topics]
+        if action == "subscribe":
+            added, rejected = self.subscribe(websocket, topics)
+        elif action == "unsubscribe":
+            self.unsubscribe(websocket, topics)
+            added, rejected = [], []
+        else:
+            return []
+
+        if client is not None:
+            self._enqueue(client, self._message("subscriptions", {
+                "topics": sorted(client.topics),
+                "rejected": rejected
+            }))
+        return added
+
     async def broadcast_score_update(self, data: dict):
-        """Broadcast score update to all connected clients"""
-        message = {
-            "type": "score_update",
-            "data": data,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"Error sending message: {e}")
-                disconnected.append(connection)
-        
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.active_connections.discard(conn)
-    
+        """Send a score update to admins and to the team and judge involved"""
+        self._publish(
+            ["scores", f"team:{data['team_name']}", f"judge:{data['judge_id']}"],
+            self._message("score_update", data)
+        )
+
     async def notify_team(self, team_name: str, data: dict):
         """Notify specific team"""
-        message = {
-            "type": "team_notification",
-            "data": data,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        if team_name in self.team_connections:
-            try:
-                await self.team_connections[team_name].send_json(message)
-            except Exception as e:
-                print(f"Error sending team notification: {e}")
-    
+        self._publish([f"team:{team_name}"], self._message("team_notification", data))
+
     async def notify_judge(self, judge_id: str, data: dict):
         """Notify specific judge"""
-        message = {
-            "type": "judge_notification",
+        self._publish([f"judge:{judge_id}"], self._message("judge_notification", data))
+
+    async def send_timer_snapshot(self, websocket: WebSocket, timer: dict):
+        """Send the current timer state to a newly connected client"""
+        client = self.active_connections.get(websocket)
+        if client is not None and "timer" in client.topics:
+            self._enqueue(client, self._timer_message("timer_update", timer))
+
+    async def broadcast_timer_update(self, timer: dict, ended: bool = False):
+        """Broadcast timer state; clients count down locally between updates"""
+        self._publish(["timer"], self._timer_message("timer_ended" if ended else "timer_update", timer))
+
+    async def send_leaderboard_snapshot(self, websocket: WebSocket, snapshot: dict):
+        """Send a full leaderboard so a client can resume applying deltas"""
+        client = self.active_connections.get(websocket)
+        if client is not None and "leaderboard" in client.topics:
+            self._enqueue(client, self._message("leaderboard_snapshot", snapshot))
+
+    async def broadcast_leaderboard_delta(self, delta: dict):
+        """Broadcast rank and score changes since the previous version"""
+        self._publish(["leaderboard"], self._message("leaderboard_delta", delta))
+
+    def _message(self, message_type: str, data) -> dict:
+        return {
+            "type": message_type,
             "data": data,
             "timestamp": datetime.now().isoformat()
         }
-        
-        if judge_id in self.judge_connections:
-            try:
-                await self.judge_connections[judge_id].send_json(message)
-            except Exception as e:
-                print(f"Error sending judge notification: {e}")
-    
-    async def broadcast_leaderboard_update(self, leaderboard: list):
-        """Broadcast updated leaderboard to all clients"""
-        message = {
-            "type": "leaderboard_update",
-            "data": leaderboard,
-            "timestamp": datetime.now().isoformat()
+
+    def _timer_message(self, message_type: str, timer: dict) -> dict:
+        # server_time lets clients correct for clock skew when counting down
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "type": message_type,
+            "data": {**timer, "server_time": now},
+            "timestamp": now
         }
-        
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"Error sending leaderboard update: {e}")
-                disconnected.append(connection)
-        
-        for conn in disconnected:
-            self.active_connections.discard(conn)
+
+    def _publish(self, topics: List[str], message: dict):
+        with BROADCAST_SECONDS.time(message["type"]):
+            recipients = set()
+            for topic in topics:
+                recipients.update(self.topics.get(topic, ()))
+            for client in recipients:
+                self._enqueue(client, message)
+
+    def _remove_topics(self, client: ClientConnection, topics: List[str]):
+        for topic in topics:
+            client.topics.discard(topic)
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.topics[topic]
+
+    def _enqueue(self, client: ClientConnection, message: dict):
+        try:
+            client.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if client.needs_resync:
+            # Still hasn't drained the previous overflow: give up on it
+            self.messages_dropped += client.queue.qsize() + 1
+            self.slow_consumers_dropped += 1
+            self._drop(client)
+            return
+
+        # Downgrade to a snapshot: discard the backlog, ask the client to resync
+        while not client.queue.empty():
+            client.queue.get_nowait()
+            self.messages_dropped += 1
+        self.messages_dropped += 1
+        client.needs_resync = True
+        client.queue.put_nowait(self._message("resync_required", {"reason": "slow_consumer"}))
+
+    async def _writer(self, client: ClientConnection):
+        try:
+            while True:
+                message = await client.queue.get()
+                await asyncio.wait_for(client.websocket.send_json(message), self.send_timeout)
+                self.messages_sent += 1
+                if message["type"] == "resync_required":
+                    client.needs_resync = False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Dropping WebSocket client %s (%s) after a failed send: %s",
+                           client.user_id, client.role, e)
+            self._drop(client)
+
+    def _drop(self, client: ClientConnection):
+        self.disconnect(client.websocket, client.user_id, client.role)
+        asyncio.create_task(self._close(client.websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
 
 
 # Global connection manager instance
@@ -0,0 +1,37 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+
+class LazyPool:
+    """A thread or process pool created on first use.
+
+    Nothing is started at import, so worker processes are not forked while
+    the server is still loading. Functions run on a process pool must be
+    defined at module level so they can be pickled.
+    """
+
+    def __init__(self, kind: str, workers: int, thread_name_prefix: str = ""):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[Executor] = None
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix=self.thread_name_prefix)
+        return self._executor
@@ -0,0 +1,40 @@
+import { useState, useRef, useCallback } from 'react';
+
+// Keeps a leaderboard in sync from a REST snapshot followed by the
+// leaderboard_delta messages pushed over the WebSocket. A delta only applies
+// on top of the version it was computed from; on a gap we ask the server for
+// a fresh snapshot instead.
+export function useLeaderboardSync() {
+  const [leaderboard, setLeaderboard] = useState([]);
+  const current = useRef({ entries: [], version: null });
+
+  const setSnapshot = useCallback((entries, version) => {
+    current.current = { entries, version };
+    setLeaderboard(entries);
+  }, []);
+
+  const setFromResponse = useCallback((response) => {
+    setSnapshot(response.data, Number(response.headers['x-leaderboard-version']));
+  }, [setSnapshot]);
+
+  const handleMessage = useCallback((message, send) => {
+    if (message.type === 'leaderboard_snapshot') {
+      setSnapshot(message.data.entries, message.data.version);
+    } else if (message.type === 'leaderboard_delta') {
+      const delta = message.data;
+      const { entries, version } = current.current;
+      if (version === delta.version) return;
+      if (version !== delta.base_version) {
+        send({ action: 'snapshot', topics: ['leaderboard'] });
+        return;
+      }
+
+      const byTeam = new Map(entries.map((entry) => [entry.team_name, entry]));
+      delta.removed.forEach((teamName) => byTeam.delete(teamName));
+      delta.changes.forEach((entry) => byTeam.set(entry.team_name, entry));
+      setSnapshot([...byTeam.values()].sort((a, b) => a.rank - b.rank), delta.version);
+    }
+  }, [setSnapshot]);
+
+  return { leaderboard, setFromResponse, handleMessage };
+}
@@ -1,22 +1,33 @@
 import { useEffect, useRef, useCallback } from 'react';
 
-export function useWebSocket(userId, role, onMessage) {
+// Signed-in pages pass their JWT, which the server reads the role and
+// identity from; it is sent as the first message so it never appears in a
+// URL. Without a token the socket joins as a public viewer.
+export function useWebSocket(token, onMessage) {
   const ws = useRef(null);
   const reconnectAttempts = useRef(0);
   const maxReconnectAttempts = 5;
   const reconnectDelay = useRef(3000);
 
-  const connect = useCallback(() => {
-    if (!userId || !role) return;
+  const send = useCallback((payload) => {
+    if (ws.current && ws.current.readyState === WebSocket.OPEN) {
+      ws.current.send(JSON.stringify(payload));
+    }
+  }, []);
 
+  const connect = useCallback(() => {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/ws/${userId}/${role}`;
+    const path = token ? '/ws' : '/ws/public';
+    const wsUrl = `${protocol}//${window.location.host}${path}`;
 
     try {
       ws.current = new WebSocket(wsUrl);
 
       ws.current.onopen = () => {
         console.log('WebSocket connected');
+        if (token) {
+          send({ action: 'auth', token });
+        }
         reconnectAttempts.current = 0;
         reconnectDelay.current = 3000;
       };
@@ -24,7 +35,7 @@ export function useWebSocket(userId, role, onMessage) {
       ws.current.onmessage = (event) => {
         try {
           const message = JSON.parse(event.data);
-          onMessage(message);
+          onMessage(message, send);
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }
@@ -34,8 +45,10 @@ export function useWebSocket(userId, role, onMessage) {
         console.error('WebSocket error:', error);
       };
 
-      ws.current.onclose = () => {
+      ws.current.onclose = (event) => {
         console.log('WebSocket disconnected');
+        // 1008: the token was rejected, retrying will not help
+        if (event.code === 1008) return;
         // Attempt to reconnect
         if (reconnectAttempts.current < maxReconnectAttempts) {
           reconnectAttempts.current += 1;
@@ -51,7 +64,7 @@ export function useWebSocket(userId, role, onMessage) {
     } catch (error) {
       console.error('Error creating WebSocket:', error);
     }
-  }, [userId, role, onMessage]);
+  }, [token, onMessage, send]);
 
   useEffect(() => {
     connect();
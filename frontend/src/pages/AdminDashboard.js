@@ -57,7 +57,7 @@ export default function AdminDashboard() {
         await Promise.all([
           api.get('/admin/judges'),
           api.get('/admin/criteria'),
-          api.get('/admin/teams'),
+          api.get('/admin/teams', { params: { fields: 'team_name' } }),
           api.get('/admin/leaderboard'),
           api.get('/admin/timer'),
         ]);
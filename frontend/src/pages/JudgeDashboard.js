@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { api, getStoredAuth, clearAuth } from '@/utils/api';
 import { useWebSocket } from '@/hooks/useWebSocket';
+import { useLeaderboardSync } from '@/hooks/useLeaderboardSync';
 import { toast } from 'sonner';
 import { Users, LogOut, Star, Trophy } from 'lucide-react';
 import { Button } from '@/components/ui/button';
@@ -19,11 +20,11 @@ export default function JudgeDashboard() {
   const navigate = useNavigate();
   const [teams, setTeams] = useState([]);
   const [criteria, setCriteria] = useState([]);
-  const [leaderboard, setLeaderboard] = useState([]);
+  const { leaderboard, setFromResponse, handleMessage } = useLeaderboardSync();
   const [activeTab, setActiveTab] = useState('teams');
   const [scoringTeam, setScoringTeam] = useState(null);
   const [scores, setScores] = useState({});
-  const { identifier } = getStoredAuth();
+  const { token } = getStoredAuth();
 
   const loadData = useCallback(async () => {
     try {
@@ -35,11 +36,11 @@ export default function JudgeDashboard() {
 
       setTeams(teamsRes.data);
       setCriteria(criteriaRes.data);
-      setLeaderboard(leaderboardRes.data);
+      setFromResponse(leaderboardRes);
     } catch (error) {
       toast.error('Failed to load data');
     }
-  }, []);
+  }, [setFromResponse]);
 
   useEffect(() => {
     const { role } = getStoredAuth();
@@ -50,14 +51,17 @@ export default function JudgeDashboard() {
     loadData();
   }, [navigate, loadData]);
 
-  const handleWebSocketMessage = useCallback((message) => {
-    if (message.type === 'score_update' || message.type === 'leaderboard_update') {
+  const handleWebSocketMessage = useCallback((message, send) => {
+    // The server pushes rank and score changes once per batch of scores
+    if (message.type === 'resync_required') {
       loadData();
+    } else {
+      handleMessage(message, send);
     }
-  }, [loadData]);
+  }, [loadData, handleMessage]);
 
   // Use WebSocket for real-time updates
-  useWebSocket(identifier, 'judge', handleWebSocketMessage);
+  useWebSocket(token, handleWebSocketMessage);
 
   const handleOpenScoring = (team) => {
     setScoringTeam(team);
@@ -143,7 +147,7 @@ export default function JudgeDashboard() {
                 {team.photo_url && (
                   <div className="mb-4 rounded-xl overflow-hidden">
                     <img
-                      src={team.photo_url}
+                      src={team.photo_thumb_url || team.photo_url}
                       alt={team.team_name}
                       className="w-full h-48 object-cover"
                     />
@@ -1,36 +1,40 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useEffect, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { api } from '@/utils/api';
 import { useWebSocket } from '@/hooks/useWebSocket';
+import { useLeaderboardSync } from '@/hooks/useLeaderboardSync';
 import { Trophy, ArrowLeft } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import { Card } from '@/components/ui/card';
 
 export default function PublicLeaderboard() {
   const navigate = useNavigate();
-  const [leaderboard, setLeaderboard] = useState([]);
+  const { leaderboard, setFromResponse, handleMessage } = useLeaderboardSync();
 
   const loadLeaderboard = useCallback(async () => {
     try {
       const response = await api.get('/public/leaderboard');
-      setLeaderboard(response.data);
+      setFromResponse(response);
     } catch (error) {
       console.error('Failed to load leaderboard');
     }
-  }, []);
+  }, [setFromResponse]);
 
   useEffect(() => {
     loadLeaderboard();
   }, [loadLeaderboard]);
 
-  const handleWebSocketMessage = useCallback((message) => {
-    if (message.type === 'score_update' || message.type === 'leaderboard_update') {
+  const handleWebSocketMessage = useCallback((message, send) => {
+    // The server pushes rank and score changes once per batch of scores
+    if (message.type === 'resync_required') {
       loadLeaderboard();
+    } else {
+      handleMessage(message, send);
     }
-  }, [loadLeaderboard]);
+  }, [loadLeaderboard, handleMessage]);
 
   // Use WebSocket for real-time updates (public user)
-  useWebSocket('public', 'public', handleWebSocketMessage);
+  useWebSocket(null, handleWebSocketMessage);
 
   return (
     <div className="ocean-bg min-h-screen">
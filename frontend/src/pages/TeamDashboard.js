@@ -1,6 +1,7 @@
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect, useRef, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { api, getStoredAuth, clearAuth } from '@/utils/api';
+import { useWebSocket } from '@/hooks/useWebSocket';
 import { toast } from 'sonner';
 import { LogOut, Timer, Trophy, Edit2, Download } from 'lucide-react';
 import { Button } from '@/components/ui/button';
@@ -28,6 +29,7 @@ export default function TeamDashboard() {
   const [timeRemaining, setTimeRemaining] = useState(0);
   const [editingMember, setEditingMember] = useState(null);
   const [showEditDialog, setShowEditDialog] = useState(false);
+  const { token } = getStoredAuth();
 
   useEffect(() => {
     const { role } = getStoredAuth();
@@ -47,6 +49,19 @@ export default function TeamDashboard() {
     }
   }, [timer]);
 
+  // The server pushes timer state on connect, on every change and at the
+  // deadline, so the countdown runs locally without polling
+  const handleWebSocketMessage = useCallback((message) => {
+    if (message.type === 'timer_update' || message.type === 'timer_ended') {
+      setTimer(message.data);
+      setTimeRemaining(Math.max(message.data.time_remaining || 0, 0));
+    } else if (message.type === 'resync_required') {
+      loadData();
+    }
+  }, []);
+
+  useWebSocket(token, handleWebSocketMessage);
+
   const loadData = async () => {
     try {
       const [profileRes, timerRes, scoreRes] = await Promise.all([
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / "frontend" / "backend"
+RESULTS_FILE = ROOT_DIR / "startup_benchmark_results.json"
+
+
+def measure_import(env):
+    """Seconds to import server.py in a fresh interpreter, plus its slowest imports"""
+    code = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only top-level packages, the nested ones are counted in them
+        if not name.startswith("  "):
+            modules.append((int(cumulative), name.strip()))
+    modules.sort(reverse=True)
+    return float(result.stdout.strip().splitlines()[-1]), modules
+
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def measure_boot(env, port, timeout):
+    """Seconds from process start until /api/health and /api/ready answer 200"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        deadline = started + timeout
+        healthy = wait_for(f"http://localhost:{port}/api/health", deadline)
+        ready = wait_for(f"http://localhost:{port}/api/ready", deadline)
+        details = None
+        if ready is not None:
+            with urllib.request.urlopen(f"http://localhost:{port}/api/ready", timeout=1) as response:
+                details = json.loads(response.read())
+        return (
+            healthy - started if healthy else None,
+            ready - started if ready else None,
+            details
+        )
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "min_ms": round(min(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend import time and time to first request")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for readiness")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to report")
+    parser.add_argument("--budget-import-ms", type=float, default=None)
+    parser.add_argument("--budget-ready-ms", type=float, default=None)
+    parser.add_argument("--output", default=str(RESULTS_FILE))
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", f"hackathon_startup_{int(time.time())}")
+
+    print(f"🚀 Measuring backend start-up over {args.runs} runs (database {env['DB_NAME']})...")
+    imports, healthy, ready, slowest, steps = [], [], [], None, []
+    for run in range(args.runs):
+        import_seconds, modules = measure_import(env)
+        imports.append(import_seconds)
+        slowest = slowest or modules
+        health_seconds, ready_seconds, details = measure_boot(env, args.port, args.timeout)
+        healthy.append(health_seconds)
+        ready.append(ready_seconds)
+        if details:
+            steps.append(details.get("steps_ms"))
+        print(f"   run {run + 1}: import {import_seconds * 1000:.0f}ms, "
+              f"first request {health_seconds * 1000 if health_seconds else float('nan'):.0f}ms, "
+              f"ready {ready_seconds * 1000 if ready_seconds else float('nan'):.0f}ms")
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "runs": args.runs,
+        "import": summarize(imports),
+        "first_request": summarize(healthy),
+        "ready": summarize(ready),
+        "warmup_steps_ms": steps[-1] if steps else None,
+        "slowest_imports_ms": [
+            {"module": name, "cumulative_ms": round(us / 1000, 1)} for us, name in (slowest or [])[:args.top]
+        ],
+        "budgets": {"import_ms": args.budget_import_ms, "ready_ms": args.budget_ready_ms}
+    }
+
+    print("\n📦 Slowest imports:")
+    for entry in results["slowest_imports_ms"]:
+        print(f"   {entry['cumulative_ms']:>8.1f}ms  {entry['module']}")
+
+    failures = []
+    if args.budget_import_ms and results["import"] and results["import"]["median_ms"] > args.budget_import_ms:
+        failures.append(f"import {results['import']['median_ms']}ms > {args.budget_import_ms}ms")
+    if args.budget_ready_ms and (not results["ready"] or results["ready"]["median_ms"] > args.budget_ready_ms):
+        failures.append(f"ready {results['ready'] and results['ready']['median_ms']}ms > {args.budget_ready_ms}ms")
+    results["over_budget"] = failures
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    for failure in failures:
+        print(f"❌ Over budget: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
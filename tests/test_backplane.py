@@ -0,0 +1,82 @@
+import asyncio
+from pymongo.errors import PyMongoError
+from backplane import MongoBackplane
+
+
+def make_backplane(seq, gap_timeout=1.0):
+    # The reorder buffer never touches the database
+    backplane = MongoBackplane({"broadcast_events": None}, gap_timeout=gap_timeout)
+    backplane.seq = seq
+    delivered = []
+
+    async def deliver(event):
+        delivered.append(event["seq"])
+
+    async def publish(event):
+        published.append(event["type"])
+
+    published = []
+    backplane._deliver = deliver
+    backplane.publish = publish
+    backplane.published = published
+    return backplane, delivered
+
+
+def receive(backplane, *seqs):
+    async def run():
+        for seq in seqs:
+            await backplane._receive({"seq": seq, "event": {"type": "score"}})
+
+    asyncio.run(run())
+
+
+def test_out_of_order_events_are_delivered_in_sequence():
+    backplane, delivered = make_backplane(seq=5)
+    receive(backplane, 7, 8, 6)
+
+    assert delivered == [6, 7, 8]
+    assert backplane.seq == 8 and not backplane._pending
+    assert backplane.published == []
+
+
+def test_missing_event_is_skipped_after_the_gap_timeout():
+    backplane, delivered = make_backplane(seq=5, gap_timeout=0)
+    receive(backplane, 7)
+    assert delivered == []
+
+    # The first flush starts the gap clock, the next one gives up on 6
+    asyncio.run(backplane._flush())
+    assert delivered == [7]
+    assert backplane.gaps_skipped == 1
+    assert backplane.published == ["resync"]
+
+
+def test_late_event_after_a_skip_is_dropped():
+    backplane, delivered = make_backplane(seq=5, gap_timeout=0)
+    receive(backplane, 7)
+    asyncio.run(backplane._flush())
+    receive(backplane, 6, 8)
+
+    assert delivered == [7, 8]
+    assert backplane.seq == 8 and not backplane._pending
+    # One resync for the skipped gap, one for the late event
+    assert backplane.published == ["resync", "resync"]
+
+
+def test_failed_resync_is_retried_on_the_next_flush():
+    backplane, delivered = make_backplane(seq=5, gap_timeout=0)
+    attempts = []
+
+    async def failing_publish(event):
+        attempts.append(event["type"])
+        if len(attempts) == 1:
+            raise PyMongoError("not primary")
+
+    backplane.publish = failing_publish
+    receive(backplane, 7)
+    asyncio.run(backplane._flush())
+    assert backplane.resyncs == 0
+
+    asyncio.run(backplane._flush())
+    assert attempts == ["resync", "resync"]
+    assert backplane.resyncs == 1
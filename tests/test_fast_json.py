@@ -0,0 +1,74 @@
+import asyncio
+import gzip
+import json
+from starlette.requests import Request
+from fast_json import ResponseCache
+
+
+def make_request(query="", accept_encoding=None):
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({
+        "type": "http", "method": "GET", "path": "/api/judge/teams", "query_string": query.encode(),
+        "headers": headers, "scheme": "http", "server": ("test", 80)
+    })
+
+
+def make_loader(rows):
+    calls = []
+
+    async def load(response):
+        calls.append(1)
+        response.headers["X-Next-Cursor"] = "abc"
+        return rows
+
+    return load, calls
+
+
+def respond(cache, request, load):
+    return asyncio.run(cache.respond(request, load))
+
+
+def test_loads_once_per_query_until_invalidated():
+    cache = ResponseCache()
+    load, calls = make_loader([{"team_name": "a"}])
+
+    first = respond(cache, make_request("limit=1"), load)
+    second = respond(cache, make_request("limit=1"), load)
+    respond(cache, make_request("limit=2"), load)
+    assert len(calls) == 2
+    assert first.body == second.body
+    assert second.headers["x-next-cursor"] == "abc"
+
+    cache.invalidate()
+    respond(cache, make_request("limit=1"), load)
+    assert len(calls) == 3
+
+
+def test_large_bodies_are_compressed_once_per_encoding():
+    cache = ResponseCache()
+    rows = [{"team_name": f"team-{i}", "project_name": "x" * 50} for i in range(100)]
+    load, calls = make_loader(rows)
+
+    plain = respond(cache, make_request(), load)
+    gzipped = respond(cache, make_request(accept_encoding="gzip"), load)
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(gzipped.body)) == rows
+    assert len(calls) == 1
+
+
+def test_load_overlapping_an_invalidation_is_not_stored():
+    cache = ResponseCache()
+    calls = []
+
+    async def load(response):
+        calls.append(1)
+        if len(calls) == 1:
+            # A write landed while this load was reading
+            cache.invalidate()
+        return []
+
+    respond(cache, make_request(), load)
+    respond(cache, make_request(), load)
+    respond(cache, make_request(), load)
+    assert len(calls) == 2
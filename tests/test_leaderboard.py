@@ -0,0 +1,159 @@
+import asyncio
+from leaderboard import LeaderboardBroadcaster, LeaderboardCache, LeaderboardRanking
+
+
+def make_ranking(*team_names):
+    ranking = LeaderboardRanking()
+    for team_name in team_names:
+        ranking.add_team(team_name)
+    return ranking
+
+
+def test_orders_by_average_score():
+    ranking = make_ranking("alpha", "beta", "gamma")
+    ranking.set_score("alpha", "j1", 10)
+    ranking.set_score("beta", "j1", 30)
+    ranking.set_score("gamma", "j1", 20)
+
+    assert [entry["team_name"] for entry in ranking.entries()] == ["beta", "gamma", "alpha"]
+    assert [entry["rank"] for entry in ranking.entries()] == [1, 2, 3]
+
+
+def test_average_is_over_judges_that_scored():
+    ranking = make_ranking("alpha", "beta")
+    ranking.set_score("alpha", "j1", 10)
+    ranking.set_score("alpha", "j2", 30)
+    ranking.set_score("beta", "j1", 25)
+
+    alpha, = [entry for entry in ranking.entries() if entry["team_name"] == "alpha"]
+    assert alpha["total_score"] == 20
+    assert alpha["judge_count"] == 2
+    assert ranking.rank_of("beta") == 1
+
+
+def test_rescoring_replaces_the_judges_previous_total():
+    ranking = make_ranking("alpha", "beta")
+    ranking.set_score("alpha", "j1", 50)
+    ranking.set_score("beta", "j1", 40)
+    ranking.set_score("alpha", "j1", 10)
+
+    assert [entry["team_name"] for entry in ranking.entries()] == ["beta", "alpha"]
+    assert ranking.entries()[1]["total_score"] == 10
+
+
+def test_ties_keep_registration_order():
+    ranking = make_ranking("first", "second", "third")
+    for team_name in ("third", "first", "second"):
+        ranking.set_score(team_name, "j1", 15)
+
+    assert [entry["team_name"] for entry in ranking.entries()] == ["first", "second", "third"]
+
+
+def test_scored_teams_rank_ahead_of_unscored_even_at_zero():
+    ranking = make_ranking("unscored", "zero")
+    ranking.set_score("zero", "j1", 0)
+
+    assert [entry["team_name"] for entry in ranking.entries(include_unscored=True)] == ["zero", "unscored"]
+    assert ranking.rank_of("zero") == 1
+    assert ranking.rank_of("unscored") is None
+
+
+def test_public_view_is_the_scored_prefix():
+    ranking = make_ranking("a", "b", "c")
+    ranking.set_score("b", "j1", 5)
+
+    assert [entry["team_name"] for entry in ranking.entries()] == ["b"]
+    assert len(ranking.entries(include_unscored=True)) == 3
+
+
+def test_rank_of_unknown_team_is_none():
+    assert make_ranking("a").rank_of("missing") is None
+
+
+def test_scores_for_unregistered_teams_apply_once_registered():
+    ranking = LeaderboardRanking()
+    ranking.set_score("late", "j1", 12)
+    assert ranking.entries(include_unscored=True) == []
+
+    ranking.add_team("late")
+    assert ranking.entries()[0]["total_score"] == 12
+
+
+def test_add_team_reports_whether_it_inserted():
+    ranking = make_ranking("a")
+    version = ranking.version
+
+    assert ranking.add_team("a") is False
+    assert ranking.version == version
+    assert ranking.add_team("b") is True
+    assert ranking.version > version
+
+
+def test_touch_adopts_an_assigned_version():
+    ranking = make_ranking("a")
+    ranking.set_score("a", "j1", 3)
+    ranking.touch(42)
+
+    assert ranking.version == 42
+    ranking.touch()
+    assert ranking.version == 43
+
+
+def test_cache_reencodes_only_when_the_version_changes():
+    ranking = make_ranking("a")
+    ranking.set_score("a", "j1", 1)
+    cache = LeaderboardCache(ranking)
+
+    body, etag, version, _ = cache.get("public")
+    assert cache.get("public")[:2] == (body, etag)
+
+    ranking.set_score("a", "j1", 2)
+    new_body, new_etag, new_version, _ = cache.get("public")
+    assert new_body != body and new_etag != etag and new_version > version
+
+
+def test_cache_compresses_large_bodies_with_their_own_etag():
+    ranking = make_ranking(*(f"team-{i}" for i in range(100)))
+    for i in range(100):
+        ranking.set_score(f"team-{i}", "j1", i)
+    cache = LeaderboardCache(ranking)
+
+    plain, plain_etag, _, plain_encoding = cache.get("public")
+    gzipped, gzip_etag, _, encoding = cache.get("public", "gzip")
+    assert plain_encoding is None and encoding == "gzip"
+    assert len(gzipped) < len(plain)
+    assert gzip_etag != plain_etag
+
+
+class RecordingManager:
+    def __init__(self):
+        self.deltas = []
+
+    async def broadcast_leaderboard_delta(self, delta):
+        self.deltas.append(delta)
+
+
+def test_broadcaster_skips_deltas_with_no_visible_change():
+    async def run():
+        ranking = make_ranking("a", "b")
+        ranking.set_score("a", "j1", 5)
+        manager = RecordingManager()
+        broadcaster = LeaderboardBroadcaster(ranking, manager, window=0)
+        broadcaster.prime()
+        base = broadcaster.version
+
+        # Same total again: the version moves but no row does
+        ranking.set_score("a", "j1", 5)
+        broadcaster.mark_dirty()
+        await broadcaster._pending
+        assert manager.deltas == [] and broadcaster.version == base
+
+        ranking.set_score("b", "j1", 7)
+        broadcaster.mark_dirty()
+        await broadcaster._pending
+        [delta] = manager.deltas
+        assert delta["base_version"] == base
+        assert delta["version"] == ranking.version
+        assert [entry["team_name"] for entry in delta["changes"]] == ["b", "a"]
+
+    asyncio.run(run())
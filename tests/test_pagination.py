@@ -0,0 +1,19 @@
+import pytest
+from fastapi import HTTPException
+from pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("value", ["Team Rocket", "Équipe Ünicode 🚀", "a/b+c=d", "65f1c0ffee0000000000beef"])
+def test_cursor_round_trips_as_header_safe_ascii(value):
+    cursor = encode_cursor(value)
+
+    cursor.encode("latin-1")
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert decode_cursor(cursor) == value
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "é", "_w"])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
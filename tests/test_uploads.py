@@ -0,0 +1,119 @@
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from uploads import MULTIPART_OVERHEAD, ImmutableStaticFiles, UploadLimitMiddleware, _parse_range
+
+LIMIT = MULTIPART_OVERHEAD
+
+
+def make_client():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadLimitMiddleware, paths=["/upload"], max_bytes=0, max_concurrency=1,
+                       authorize=lambda headers: headers.get("authorization") == "Bearer team")
+    return TestClient(app)
+
+
+def multipart(size):
+    return (
+        b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.jpg\"\r\n"
+        b"Content-Type: image/jpeg\r\n\r\n" + b"x" * size + b"\r\n--b--\r\n"
+    )
+
+
+def chunked(body, chunk=8192):
+    # A generator body is sent without Content-Length
+    for i in range(0, len(body), chunk):
+        yield body[i:i + chunk]
+
+
+HEADERS = {"Content-Type": "multipart/form-data; boundary=b", "Authorization": "Bearer team"}
+
+
+def test_unauthorized_upload_is_refused_up_front():
+    response = make_client().post("/upload", content=multipart(10), headers={**HEADERS, "Authorization": "Bearer nope"})
+    assert response.status_code == 401
+
+
+def test_small_upload_passes_through():
+    response = make_client().post("/upload", content=chunked(multipart(1000)), headers=HEADERS)
+    assert response.status_code == 200
+    assert response.json() == {"size": 1000}
+
+
+def test_declared_length_over_the_limit_is_refused():
+    response = make_client().post("/upload", content=multipart(LIMIT + 1), headers=HEADERS)
+    assert response.status_code == 413
+
+
+def test_chunked_upload_is_cut_off_once_past_the_limit():
+    response = make_client().post("/upload", content=chunked(multipart(LIMIT * 3)), headers=HEADERS)
+    assert response.status_code == 413
+    assert "too large" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("header, size, expected", [
+    ("bytes=0-9", 100, (0, 9)),
+    ("bytes=90-", 100, (90, 99)),
+    ("bytes=90-500", 100, (90, 99)),
+    ("bytes=-10", 100, (90, 99)),
+    ("bytes=-500", 100, (0, 99)),
+    ("bytes=5-2", 100, None),
+    ("bytes=0-1,5-6", 100, None),
+    ("items=0-1", 100, None),
+    ("bytes=-", 100, None),
+])
+def test_parse_range(header, size, expected):
+    assert _parse_range(header, size) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=100-", 100),
+    ("bytes=-0", 100),
+    ("bytes=-5", 0),
+    ("bytes=0-0", 0),
+])
+def test_unsatisfiable_range_raises(header, size):
+    with pytest.raises(ValueError):
+        _parse_range(header, size)
+
+
+STORED = "a" * 64 + ".jpg"
+EMPTY = "b" * 64 + ".jpg"
+
+
+@pytest.fixture
+def static_client(tmp_path):
+    (tmp_path / STORED).write_bytes(bytes(range(100)))
+    (tmp_path / EMPTY).write_bytes(b"")
+    app = FastAPI()
+    app.mount("/uploads", ImmutableStaticFiles(directory=tmp_path))
+    return TestClient(app)
+
+
+def test_range_is_served_partially(static_client):
+    response = static_client.get(f"/uploads/{STORED}", headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 10-19/100"
+    assert response.content == bytes(range(10, 20))
+
+
+def test_if_range_with_a_different_etag_returns_the_whole_file(static_client):
+    etag = f'"{STORED}"'
+    matching = static_client.get(f"/uploads/{STORED}", headers={"Range": "bytes=0-4", "If-Range": etag})
+    stale = static_client.get(f"/uploads/{STORED}", headers={"Range": "bytes=0-4", "If-Range": '"other"'})
+
+    assert matching.status_code == 206 and matching.content == bytes(range(5))
+    assert stale.status_code == 200 and len(stale.content) == 100
+
+
+def test_range_of_an_empty_file_is_416(static_client):
+    response = static_client.get(f"/uploads/{EMPTY}", headers={"Range": "bytes=-5"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */0"
@@ -0,0 +1,35 @@
+import asyncio
+import json
+import pytest
+from starlette.websockets import WebSocketState
+from websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.client_state = WebSocketState.CONNECTING
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+@pytest.mark.parametrize("message", [
+    {"action": "snapshot", "topics": [{}]},
+    {"action": "unsubscribe", "topics": [[1]]},
+    {"action": "subscribe", "topics": [{"a": 1}, None]},
+])
+def test_unhashable_topics_are_ignored(message):
+    async def run():
+        manager = ConnectionManager()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, "j1", "judge")
+
+        assert manager.handle_client_message(websocket, json.dumps(message)) == []
+        assert manager.active_connections[websocket].topics == {"leaderboard", "timer", "judge:j1"}
+        manager.disconnect(websocket, "j1", "judge")
+
+    asyncio.run(run())